@@ -0,0 +1,81 @@
+'''
+Description:
+    Synthetic video fixtures for the benchmarks (no sample footage needed).
+    Clips are cached in the fixture dir and only generated once per
+    (kind, size, frames).
+'''
+
+import os
+import cv2
+import numpy as np
+
+SIZES = {
+    "480p": (854, 480),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+KINDS = ("dark", "bright", "noisy")
+
+
+def _base_frame(kind: str, w: int, h: int, rng: np.random.Generator) -> np.ndarray:
+    # Smooth gradient + a few shapes, so Retinex / CLAHE have structure to work on
+    gx = np.linspace(0.0, 1.0, w, dtype=np.float32)[None, :]
+    gy = np.linspace(0.0, 1.0, h, dtype=np.float32)[:, None]
+    grad = 0.6 * gx + 0.4 * gy
+    img = np.stack([grad, grad[:, ::-1] * 0.8 + 0.1, 1.0 - grad], axis=-1)
+    for _ in range(12):
+        c = (int(rng.integers(0, w)), int(rng.integers(0, h)))
+        r = int(rng.integers(h // 20, h // 6))
+        cv2.circle(img, c, r, tuple(float(v) for v in rng.uniform(0.2, 1.0, 3)), -1)
+
+    if kind == "dark":
+        img = img * 0.18
+    elif kind == "bright":
+        img = 0.65 + img * 0.35
+    return np.clip(img * 255.0, 0, 255).astype(np.uint8)
+
+
+def make_clip(path: str, kind: str = "dark", size: str = "480p", frames: int = 60, fps: float = 30.0) -> str:
+    """Write a synthetic clip (moving object over a static scene) to `path`."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown fixture kind: {kind}")
+    w, h = SIZES[size]
+    rng = np.random.default_rng(0)
+    base = _base_frame(kind, w, h, rng)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+    if not writer.isOpened():
+        raise RuntimeError(f"Cannot open writer: {path}")
+
+    r = max(4, h // 10)
+    for i in range(frames):
+        frame = base.copy()
+        x = int((i / max(1, frames - 1)) * (w - 2 * r)) + r
+        cv2.circle(frame, (x, h // 2), r, (40, 200, 220) if kind != "bright" else (250, 250, 250), -1)
+        if kind == "noisy":
+            noise = rng.normal(0.0, 18.0, frame.shape).astype(np.float32)
+            frame = np.clip(frame.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def get_clip(fixture_dir: str, kind: str, size: str, frames: int) -> str:
+    path = os.path.join(fixture_dir, f"{kind}_{size}_{frames}.mp4")
+    if not os.path.isfile(path):
+        make_clip(path, kind=kind, size=size, frames=frames)
+    return path
+
+
+def load_frames(path: str, limit: int = 0) -> list:
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while not limit or len(frames) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
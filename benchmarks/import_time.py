@@ -0,0 +1,144 @@
+'''
+Description:
+    Startup import-time benchmark based on `python -X importtime`.
+
+    python -m benchmarks.import_time --out import_baseline.json
+    python -m benchmarks.import_time --compare import_baseline.json     # exit 1 on regression
+
+    Each target runs in a fresh interpreter --repeat times and the fastest
+    run is kept; its time is everything imported beyond a bare interpreter.
+    The CLI target runs `python -m video_enhancer --help`, so imports made
+    while building the parser count too. A target also fails the check if it
+    pulls in one of its forbidden modules (e.g. cv2 at GUI startup, PyQt6 in
+    the CLI). Other modules given to --modules are measured as `import <name>`.
+    Output JSON: {"meta": {...}, "results": {"<target>": {
+        "total_ms", "top": [[name, cumulative_ms], ...], "forbidden": [...]}}}
+'''
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# target -> (interpreter arguments, modules it must not import at startup)
+TARGETS = {
+    "ui.main_window": (["-c", "import ui.main_window"], ("cv2", "numpy", "models")),
+    "video_enhancer.cli": (["-m", "video_enhancer", "--help"], ("PyQt6", "cv2", "numpy", "models")),
+}
+
+_startup = None
+
+
+def _importtime(args: list) -> tuple:
+    """({name: (self_us, cumulative_us)}, [top-level names]) for one cold run of `python args`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime"] + list(args),
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"python {' '.join(args)} failed:\n{proc.stderr.strip()[-2000:]}")
+    times, top_level = {}, []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, raw = line[len("import time:"):].split("|")
+        name = raw.strip()
+        times[name] = (int(self_us), int(cum_us))
+        # Nested imports are indented under their importer
+        if raw[1:2] != " ":
+            top_level.append(name)
+    return times, top_level
+
+
+def measure(target: str) -> tuple:
+    """({name: (self_us, cumulative_us)}, total_us) for one cold run of `target`."""
+    global _startup
+    if _startup is None:
+        _startup = set(_importtime(["-c", "pass"])[0])
+    args = TARGETS[target][0] if target in TARGETS else ["-c", f"import {target}"]
+    times, top_level = _importtime(args)
+    total = sum(times[name][1] for name in top_level if name not in _startup)
+    return times, total
+
+
+def run(modules: list, repeat: int = 5, top: int = 10, log=print) -> dict:
+    results = {}
+    for module in modules:
+        best, best_total = None, None
+        for _ in range(max(1, repeat)):
+            times, total = measure(module)
+            if best is None or total < best_total:
+                best, best_total = times, total
+        forbidden = sorted(
+            name for name in best
+            for prefix in TARGETS.get(module, ((), ()))[1]
+            if name == prefix or name.startswith(prefix + ".")
+        )
+        heaviest = sorted(((n, t[1] / 1000.0) for n, t in best.items() if n != module and n not in _startup),
+                          key=lambda x: -x[1])[:top]
+        results[module] = {
+            "total_ms": best_total / 1000.0,
+            "top": heaviest,
+            "forbidden": forbidden,
+        }
+        log(f"{module:30s} {results[module]['total_ms']:8.1f} ms"
+            + (f"  FORBIDDEN: {', '.join(forbidden)}" if forbidden else ""))
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "repeat": repeat},
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.25, min_ms: float = 5.0) -> list:
+    """Regressions: forbidden imports, or total import time up by more than `threshold` (and `min_ms`)."""
+    regressions = []
+    for module, cur in current["results"].items():
+        if cur["forbidden"]:
+            regressions.append(f"{module}: imports {', '.join(cur['forbidden'])} at startup")
+        base = baseline.get("results", {}).get(module)
+        if base is None:
+            continue
+        if cur["total_ms"] > base["total_ms"] * (1.0 + threshold) and cur["total_ms"] - base["total_ms"] > min_ms:
+            regressions.append(f"{module}: {base['total_ms']:.1f} ms -> {cur['total_ms']:.1f} ms")
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.import_time", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--modules", default=",".join(TARGETS), help="comma list of targets / modules to import")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10, help="heaviest imports listed per module")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--compare", help="baseline JSON; exit 1 if anything regressed")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown (default 0.25)")
+    args = ap.parse_args(argv)
+
+    modules = [m.strip() for m in args.modules.split(",") if m.strip()]
+    report = run(modules, repeat=args.repeat, top=args.top)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    regressions = [f"{m}: imports {', '.join(r['forbidden'])} at startup"
+                   for m, r in report["results"].items() if r["forbidden"]]
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, threshold=args.threshold)
+    for r in regressions:
+        print("REGRESSION", r)
+    if regressions:
+        return 1
+    if args.compare:
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
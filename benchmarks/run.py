@@ -0,0 +1,305 @@
+'''
+Description:
+    Throughput benchmarks for every enhancement path.
+
+    python -m benchmarks.run --sizes 480p,1080p --kinds dark,noisy --out bench.json
+    python -m benchmarks.run --compare bench_baseline.json      # exit 1 on regression
+
+    Every (case, clip) runs in a fresh spawned process so peak RSS is per case.
+    Output JSON: {"meta": {...}, "results": {"<case>/<kind>_<size>": {
+        "frames", "fps", "stages_ms": {stage: {"mean", "p50", "p90", "max"}}, "peak_rss_mb"}}}
+'''
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.fixtures import SIZES, KINDS, get_clip, load_frames
+
+
+# ---- Cases: fn(clip_path, frames) -> {"frames": n, "seconds": s, "stages": {name: [ms, ...]}} ----
+
+def _time_frames(frames: list, stages: dict) -> dict:
+    """stages: name -> fn(frame). Each stage is timed on every frame, in order."""
+    timings = {name: [] for name in stages}
+    t_start = time.perf_counter()
+    for frame in frames:
+        for name, fn in stages.items():
+            t0 = time.perf_counter()
+            fn(frame)
+            timings[name].append((time.perf_counter() - t0) * 1000.0)
+    return {"frames": len(frames), "seconds": time.perf_counter() - t_start, "stages": timings}
+
+
+def case_histeq(clip: str, n: int) -> dict:
+    from models.hist_equa import HistogramEqualizer
+    eq = HistogramEqualizer()
+    return _time_frames(load_frames(clip, n), {"apply": eq.apply})
+
+
+def case_gamma(clip: str, n: int) -> dict:
+    from models.power_transformation import PowerLawVideoProcessor
+    p = PowerLawVideoProcessor(gamma=0.6)
+    return _time_frames(load_frames(clip, n), {"apply": p.apply})
+
+
+def _retinex_stages(frames: list, **kw) -> dict:
+    import cv2
+    from models import retinex_temporal as rt
+
+    r = rt.TemporalRetinex(**kw)
+    state = {}
+
+    def split(frame):
+        state["L"], state["A"], state["B"] = cv2.split(cv2.cvtColor(frame, cv2.COLOR_BGR2LAB))
+
+    def blur(_):
+        if r.illum_mode == "pyramid" and r.illum_scale is None:
+            r.illum_scale = rt.calibrate_illum_scale(state["L"], r.sigma_retinex, tol=r.illum_tol)
+        state["R"] = rt.log_reflectance(state["L"], sigma=r.sigma_retinex, illum_mode=r.illum_mode,
+                                        illum_scale=r.illum_scale or 1)
+
+    def percentile(_):
+        state["bounds"] = rt.reflectance_bounds(state["R"], r.p_low, r.p_high, mode=r.quantile_mode)
+
+    def normalize(_):
+        state["Lr"] = rt.normalize_reflectance(state["R"], *state["bounds"], gain=r.gain_retinex,
+                                               offset=r.offset_retinex)
+
+    def scale(_):
+        s = rt.exposure_scale_from_mean(state["Lr"], target_L=r.target_L, min_scale=r.min_scale,
+                                        max_scale=r.max_scale)
+        state["Lx"] = cv2.LUT(state["Lr"], rt.tone_lut(r.advance(s), r.hl_strength))
+
+    def deband(_):
+        state["Lx"] = rt.deband_L(state["Lx"], sigma=r.deband_sigma)
+
+    def median(_):
+        state["A"], state["B"] = rt.denoise_chroma_lab(state["A"], state["B"], k=r.chroma_median_k)
+
+    def unsharp(_):
+        state["Lx"] = rt.unsharp_mask_L(state["Lx"], amount=r.sharp_amount, radius=r.sharp_radius,
+                                        threshold=r.sharp_threshold)
+
+    def merge(_):
+        cv2.cvtColor(cv2.merge([state["Lx"], state["A"], state["B"]]), cv2.COLOR_LAB2BGR)
+
+    return _time_frames(frames, {
+        "split": split, "blur": blur, "percentile": percentile, "normalize": normalize,
+        "scale": scale, "deband": deband, "median": median, "unsharp": unsharp, "merge": merge,
+    })
+
+
+def case_retinex(clip: str, n: int) -> dict:
+    return _retinex_stages(load_frames(clip, n), sigma_retinex=80.0)
+
+
+def case_retinex_fast(clip: str, n: int) -> dict:
+    return _retinex_stages(load_frames(clip, n), sigma_retinex=80.0, illum_mode="pyramid", quantile_mode="sample")
+
+
+def _time_video(fn, n: int) -> dict:
+    t0 = time.perf_counter()
+    fn()
+    return {"frames": n, "seconds": time.perf_counter() - t0, "stages": {}}
+
+
+def _video_case(clip: str, n: int, make_processor) -> dict:
+    tmp = tempfile.mkdtemp(prefix="bench_")
+    try:
+        out = os.path.join(tmp, "out.mp4")
+        return _time_video(lambda: make_processor(clip, out), n)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def case_histeq_video(clip: str, n: int, pipeline: bool = False) -> dict:
+    from models.hist_equa import HistogramEqualizer
+    from utils.video_process import VideoProcessor, VideoProcessConfig
+    eq = HistogramEqualizer()
+    cfg = VideoProcessConfig(codec="mp4v", pipeline=pipeline)
+    return _video_case(clip, n, lambda i, o: VideoProcessor().process(i, o, eq.apply, cfg))
+
+
+def case_histeq_video_pipeline(clip: str, n: int) -> dict:
+    return case_histeq_video(clip, n, pipeline=True)
+
+
+def case_histeq_video_process(clip: str, n: int) -> dict:
+    from models.hist_equa import HistogramEqualizer
+    from utils.video_process import VideoProcessor, VideoProcessConfig
+    cfg = VideoProcessConfig(codec="mp4v", backend="process")
+    return _video_case(clip, n, lambda i, o: VideoProcessor().process(i, o, HistogramEqualizer().apply, cfg))
+
+
+def case_histeq_video_temporal(clip: str, n: int) -> dict:
+    from models.hist_equa import HistogramEqualizer
+    from utils.video_process import VideoProcessor, VideoProcessConfig
+    cfg = VideoProcessConfig(codec="mp4v", pipeline=True)
+    return _video_case(clip, n, lambda i, o: VideoProcessor().process(i, o, HistogramEqualizer(temporal=True), cfg))
+
+
+def case_clahe_video(clip: str, n: int, pipeline: bool = False) -> dict:
+    from models.clahe import CLAHEVideoProcessor
+    return _video_case(clip, n, lambda i, o: CLAHEVideoProcessor(clip_limit=2.5, pipeline=pipeline).process(i, o))
+
+
+def case_clahe_video_pipeline(clip: str, n: int) -> dict:
+    return case_clahe_video(clip, n, pipeline=True)
+
+
+def case_clahe_video_temporal(clip: str, n: int) -> dict:
+    from models.clahe import CLAHEVideoProcessor
+    return _video_case(clip, n, lambda i, o: CLAHEVideoProcessor(clip_limit=2.5, pipeline=True, temporal=True).process(i, o))
+
+
+def case_extract(clip: str, n: int) -> dict:
+    from utils.frame_extraction import FrameExtractor, ExtractConfig
+    tmp = tempfile.mkdtemp(prefix="bench_")
+    try:
+        cfg = ExtractConfig(mode="every_n", value=5, ext="png")
+        return _time_video(lambda: FrameExtractor().extract(clip, tmp, cfg), n)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+CASES = {
+    "histeq": case_histeq,
+    "gamma": case_gamma,
+    "retinex": case_retinex,
+    "retinex_fast": case_retinex_fast,
+    "histeq_video": case_histeq_video,
+    "histeq_video_pipeline": case_histeq_video_pipeline,
+    "histeq_video_process": case_histeq_video_process,
+    "histeq_video_temporal": case_histeq_video_temporal,
+    "clahe_video": case_clahe_video,
+    "clahe_video_pipeline": case_clahe_video_pipeline,
+    "clahe_video_temporal": case_clahe_video_temporal,
+    "extract": case_extract,
+}
+
+
+# ---- Runner ----
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0
+
+
+def _summarize(ms: list) -> dict:
+    a = np.asarray(ms, dtype=np.float64)
+    return {
+        "mean": float(a.mean()),
+        "p50": float(np.percentile(a, 50)),
+        "p90": float(np.percentile(a, 90)),
+        "max": float(a.max()),
+    }
+
+
+def _run_case(case: str, clip: str, frames: int) -> dict:
+    raw = CASES[case](clip, frames)
+    return {
+        "frames": raw["frames"],
+        "fps": raw["frames"] / raw["seconds"] if raw["seconds"] > 0 else 0.0,
+        "stages_ms": {name: _summarize(ms) for name, ms in raw["stages"].items() if ms},
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run(cases: list, kinds: list, sizes: list, frames: int, fixture_dir: str, log=print) -> dict:
+    import cv2
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    for size in sizes:
+        for kind in kinds:
+            clip = get_clip(fixture_dir, kind, size, frames)
+            for case in cases:
+                key = f"{case}/{kind}_{size}"
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    results[key] = pool.submit(_run_case, case, clip, frames).result()
+                r = results[key]
+                log(f"{key:40s} {r['fps']:8.1f} fps  peak {r['peak_rss_mb'] or 0:7.1f} MB")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "frames": frames,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.10, min_ms: float = 0.05) -> list:
+    """Regressions: fps down or a stage's mean ms up by more than `threshold`."""
+    regressions = []
+    for key, cur in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        if base["fps"] > 0 and cur["fps"] < base["fps"] * (1.0 - threshold):
+            regressions.append(f"{key}: fps {base['fps']:.1f} -> {cur['fps']:.1f}")
+        for stage, st in cur["stages_ms"].items():
+            b = base.get("stages_ms", {}).get(stage)
+            if b is None or b["mean"] < min_ms:
+                continue
+            if st["mean"] > b["mean"] * (1.0 + threshold):
+                regressions.append(f"{key} [{stage}]: {b['mean']:.2f} ms -> {st['mean']:.2f} ms")
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--cases", default=",".join(CASES), help="comma list of: " + ", ".join(CASES))
+    ap.add_argument("--kinds", default="dark", help="comma list of: " + ", ".join(KINDS))
+    ap.add_argument("--sizes", default="480p", help="comma list of: " + ", ".join(SIZES))
+    ap.add_argument("--frames", type=int, default=60)
+    ap.add_argument("--fixtures", default=os.path.join(tempfile.gettempdir(), "video_enhancer_bench"))
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--compare", help="baseline JSON; exit 1 if anything regressed")
+    ap.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown (default 0.10)")
+    args = ap.parse_args(argv)
+
+    split = lambda s: [x.strip() for x in s.split(",") if x.strip()]
+    cases = split(args.cases)
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        ap.error(f"unknown case(s): {', '.join(unknown)}")
+
+    report = run(cases, split(args.kinds), split(args.sizes), args.frames, args.fixtures)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, threshold=args.threshold)
+        for r in regressions:
+            print("REGRESSION", r)
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,213 @@
-import os
+import threading
 import cv2
+import numpy as np
 from typing import Optional, Callable
+from utils.video_process import VideoProcessor, VideoProcessConfig
+from utils.workspace import FrameWorkspace
+from utils.profiling import FrameProfiler
+from utils.region_skip import StaticRegionSkip
+
+
+MAX_TEMPORAL_TILE_ROWS = 126  # 256 * (126 + 1) < SHRT_MAX
+
+
+class TemporalCLAHE:
+    """
+    CLAHE on a sequence of L planes that keeps each tile's mapping between frames.
+
+    Every frame, a subsampled histogram of each tile (every `sample_step`-th
+    pixel) is compared with the one its mapping was built from, using the
+    largest CDF difference (roughly how far the mapping would move, as a
+    fraction of the output range). Only tiles that drift past
+    `drift_threshold` get a new clip-limited mapping. The LUTs in use move
+    toward it by `lut_alpha` per frame, which removes the frame-to-frame
+    flicker of plain CLAHE. Mappings are applied with bilinear interpolation
+    between tile centres, as cv2.CLAHE does, in a single cv2.remap.
+
+    Tiles follow cv2.CLAHE's geometry: a plane that isn't a multiple of the
+    grid is padded on the right / bottom (BORDER_REFLECT_101) to the next
+    multiple, so every tile has the same size. With sample_step=1,
+    lut_alpha=1 and drift_threshold < 0 the result is within 1 grey level of
+    cv2.CLAHE (remap's fixed-point weights). With sample_step > 1 the
+    histograms are estimates (scaled to full-tile counts before clipping):
+    measured up to 2-3 levels off at 1080p and up to ~8 on small tiles
+    (480p, 16x16), mean deviation below 0.5.
+
+    stateful: frames must arrive in order (see VideoProcessor).
+    stats: {"frames", "tile_updates"} since the last reset().
+    """
+    stateful = True
+
+    def __init__(
+        self,
+        clip_limit: float = 2.0,
+        tile_grid_size: tuple[int, int] = (8, 8),
+        lut_alpha: float = 0.25,
+        drift_threshold: float = 0.02,
+        sample_step: int = 2,
+    ):
+        if not 0.0 < lut_alpha <= 1.0:
+            raise ValueError("lut_alpha must be in (0, 1]")
+        if not 0 < tile_grid_size[1] <= MAX_TEMPORAL_TILE_ROWS or tile_grid_size[0] <= 0:
+            # The LUT stack is 256 * (rows + 1) image rows, and cv2.remap
+            # can't sample sources taller than SHRT_MAX
+            raise ValueError(f"temporal CLAHE supports 1..{MAX_TEMPORAL_TILE_ROWS} tile rows, "
+                             f"got {tile_grid_size[1]}")
+        self.clip_limit = float(clip_limit)
+        self.tile_grid_size = (int(tile_grid_size[0]), int(tile_grid_size[1]))
+        self.lut_alpha = float(lut_alpha)
+        self.drift_threshold = float(drift_threshold)
+        self.sample_step = max(1, int(sample_step))
+        self.reset()
+
+    def reset(self):
+        self.stats = {"frames": 0, "tile_updates": 0}
+        self._shape = None
+        self._ref_cdf = None    # (tiles_y, tiles_x, 256) CDF each target LUT was built from
+        self._target = None     # LUTs for the current content
+        self._lut = None        # LUTs in use, EMA toward _target
+        self._table = None      # uint8 remap source, see _build_maps
+        self._settling = False
+
+    def _build_maps(self, shape):
+        """
+        The LUTs are laid out as one small image, row v * (tiles_y + 1) + tile_y,
+        column tile_x. Sampling it at (tile_x, v * stride + tile_y) with linear
+        interpolation is bilinear interpolation between the four nearest tiles'
+        LUTs at value v. Coordinates are clamped to the outer tile centres, so
+        rows of the next value are never mixed in.
+        """
+        h, w = shape
+        tx, ty = self.tile_grid_size
+        # cv2.CLAHE pads to whole tiles; tile (i, j) covers padded pixels
+        # [j * tile_h, (j + 1) * tile_h) x [i * tile_w, (i + 1) * tile_w).
+        # Like cv2, once either side needs padding both get t - n % t (a
+        # side that was already a multiple grows by t pixels).
+        if h % ty == 0 and w % tx == 0:
+            ph, pw = h, w
+        else:
+            ph, pw = h + ty - h % ty, w + tx - w % tx
+        tile_h, tile_w = ph // ty, pw // tx
+        self._stride = ty + 1
+        fx = np.clip(np.arange(w, dtype=np.float32) / np.float32(tile_w) - 0.5, 0, tx - 1)
+        fy = np.clip(np.arange(h, dtype=np.float32) / np.float32(tile_h) - 0.5, 0, ty - 1)
+        self._map_x = np.ascontiguousarray(np.broadcast_to(fx, (h, w)))
+        self._map_y0 = np.ascontiguousarray(np.broadcast_to(fy[:, None], (h, w)))
+        self._map_y = np.empty((h, w), np.float32)
+        self._row_of_value = (np.arange(256, dtype=np.float32) * self._stride).reshape(256, 1)
+        self._table = np.zeros((256 * self._stride, tx), np.uint8)
+
+        # Histograms come from every sample_step-th pixel of the padded plane:
+        # sample rows / columns, mapped back into the plane (REFLECT_101), and
+        # each tile's range of them
+        s = self.sample_step
+        rows, cols = np.arange(0, ph, s), np.arange(0, pw, s)
+        self._rows = None if ph == h else np.where(rows < h, rows, 2 * h - 2 - rows).clip(0, h - 1)
+        self._cols = None if pw == w else np.where(cols < w, cols, 2 * w - 2 - cols).clip(0, w - 1)
+        self._ys = -(-np.arange(ty + 1) * tile_h // s)
+        self._xs = -(-np.arange(tx + 1) * tile_w // s)
+        areas = np.diff(self._ys)[:, None] * np.diff(self._xs)[None, :]
+        self._area = np.maximum(areas, 1).astype(np.float32)
+        # Sampled histograms are scaled to full-tile counts, so clipping and
+        # redistribution see the same totals as cv2.CLAHE
+        self._tile_area = np.full_like(self._area, tile_h * tile_w)
+        self._shape = shape
+
+    def sample(self, img: np.ndarray) -> np.ndarray:
+        """The pixels of `img` (a plane, or a frame of the same size) the tile histograms are built from."""
+        shape = img.shape[:2]
+        if shape != self._shape:
+            self.reset()
+            self._build_maps(shape)
+        s = self.sample_step
+        if self._rows is None and self._cols is None:
+            return img[::s, ::s]
+        rows = self._rows if self._rows is not None else slice(None, None, s)
+        cols = self._cols if self._cols is not None else slice(None, None, s)
+        return img[rows][:, cols]
+
+    def _tile_hists(self, sub: np.ndarray) -> np.ndarray:
+        tx, ty = self.tile_grid_size
+        hist = np.empty((ty, tx, 256), np.float32)
+        for j in range(ty):
+            rows = sub[self._ys[j]:self._ys[j + 1]]
+            for i in range(tx):
+                hist[j, i] = cv2.calcHist([rows[:, self._xs[i]:self._xs[i + 1]]], [0], None, [256], [0, 256]).ravel()
+        return hist
+
+    def _clipped_luts(self, hist: np.ndarray, area: np.ndarray) -> np.ndarray:
+        """cv2.CLAHE's clip / redistribute / equalize for each row of hist (n, 256)."""
+        clip = np.maximum(np.floor(self.clip_limit * area / 256.0), 1.0)[:, None]
+        excess = np.maximum(hist - clip, 0).sum(axis=1)
+        hist = np.minimum(hist, clip) + np.floor(excess / 256.0)[:, None]
+        residual = (excess - np.floor(excess / 256.0) * 256.0).astype(np.int64)
+        step = np.maximum(256 // np.maximum(residual, 1), 1)[:, None]
+        bins = np.arange(256)[None, :]
+        hist += ((bins % step == 0) & (bins // step < residual[:, None]))
+        return np.clip(np.cumsum(hist, axis=1) * (255.0 / area)[:, None], 0, 255).astype(np.float32)
+
+    def update(self, L: np.ndarray, shape: Optional[tuple] = None) -> int:
+        """
+        Refresh the mappings from one L plane. Returns the number of tiles rebuilt.
+        With `shape`, L is already sample()d from a plane of that shape.
+        """
+        if shape is None:
+            shape, L = L.shape, self.sample(L)
+        elif shape != self._shape:
+            self.reset()
+            self._build_maps(shape)
+        hist = self._tile_hists(L)
+        cdf = np.cumsum(hist, axis=2) / self._area[:, :, None]
+
+        if self._ref_cdf is None:
+            drifted = np.ones(self._area.shape, bool)
+        else:
+            drifted = np.abs(cdf - self._ref_cdf).max(axis=2) > self.drift_threshold
+        n = int(drifted.sum())
+        if n:
+            scale = (self._tile_area / self._area)[drifted][:, None]
+            luts = self._clipped_luts(hist[drifted] * scale, self._tile_area[drifted])
+            if self._ref_cdf is None:
+                self._ref_cdf, self._target, self._lut = cdf, luts.reshape(hist.shape), luts.reshape(hist.shape).copy()
+            else:
+                self._ref_cdf[drifted] = cdf[drifted]
+                self._target[drifted] = luts
+            self._settling = True
+
+        if self._settling:
+            diff = self._target - self._lut
+            if self.lut_alpha >= 1.0 or np.abs(diff).max() < 0.5:
+                self._lut[...] = self._target
+                self._settling = False
+            else:
+                self._lut += self.lut_alpha * diff
+            table = self._table.reshape(256, self._stride, -1)
+            table[:, :-1, :] = np.rint(self._lut).astype(np.uint8).transpose(2, 0, 1)
+
+        self.stats["frames"] += 1
+        self.stats["tile_updates"] += n
+        return n
+
+    @property
+    def table(self) -> np.ndarray:
+        """The LUTs in use, as the uint8 remap source (updated in place)."""
+        return self._table
+
+    def remap(self, L: np.ndarray, y0: int = 0, x0: int = 0, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """Equalize L, the region of the last update()'s plane starting at (y0, x0), with the current mappings."""
+        h, w = L.shape
+        if (h, w) == self._shape:
+            map_y = cv2.add(cv2.LUT(L, self._row_of_value), self._map_y0, dst=self._map_y)
+            map_x = self._map_x
+        else:
+            map_y = cv2.add(cv2.LUT(L, self._row_of_value), self._map_y0[y0:y0 + h, x0:x0 + w])
+            map_x = self._map_x[y0:y0 + h, x0:x0 + w]
+        return cv2.remap(self._table, map_x, map_y, cv2.INTER_LINEAR, dst=dst)
+
+    def apply_l(self, L: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """Update from L and return the equalized plane (into dst if given)."""
+        self.update(L)
+        return self.remap(L, dst=dst)
 
 
 class CLAHEVideoProcessor:
@@ -9,72 +216,131 @@ class CLAHEVideoProcessor:
         clip_limit: float = 2.0,
         tile_grid_size: tuple[int, int] = (8, 8),
         codec: str = "mp4v",
+        pipeline: bool = False,
+        workers: int = 0,
+        reuse_buffers: bool = False,
+        temporal: bool = False,
+        lut_alpha: float = 0.25,
+        drift_threshold: float = 0.02,
+        skip_static: bool = False,
     ):
         self.clip_limit = float(clip_limit)
         self.tile_grid_size = tile_grid_size
         self.codec = codec
+        self.pipeline = pipeline
+        self.workers = workers
+        self.reuse_buffers = reuse_buffers
+        # reuse_buffers: planes come from the workspace and the result is
+        # written back into the input frame (no per-frame allocations)
+        self._ws = FrameWorkspace() if reuse_buffers else None
 
-        self._clahe = cv2.createCLAHE(
-            clipLimit=self.clip_limit,
-            tileGridSize=self.tile_grid_size
-        )
+        # temporal: per-tile mappings carried across frames (see TemporalCLAHE),
+        # which makes the transform stateful. skip_static (see StaticRegionSkip)
+        # needs mappings that stay put between frames, so it implies temporal.
+        temporal = temporal or skip_static
+        self.skip_static = skip_static
+        self.temporal = temporal
+        self.stateful = temporal
+        self._temporal = TemporalCLAHE(
+            clip_limit, tile_grid_size, lut_alpha=lut_alpha, drift_threshold=drift_threshold
+        ) if temporal else None
+
+        # cv2.CLAHE keeps scratch buffers internally => one instance per thread
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # cv2.CLAHE instances are per thread and don't pickle; workers make their own
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _get_clahe(self):
+        clahe = getattr(self._local, "clahe", None)
+        if clahe is None:
+            clahe = cv2.createCLAHE(
+                clipLimit=self.clip_limit,
+                tileGridSize=self.tile_grid_size
+            )
+            self._local.clahe = clahe
+        return clahe
+
+    def apply(self, frame_bgr):
+        """CLAHE on the L channel of one BGR frame."""
+        return self._apply_clahe(frame_bgr)
+
+    __call__ = apply
+
+    def _equalize_l(self, l, dst=None):
+        if self._temporal is not None:
+            return self._temporal.apply_l(l, dst)
+        return self._get_clahe().apply(l, dst)
 
     def _apply_clahe(self, frame_bgr):
+        if self._ws is not None:
+            return self._apply_clahe_inplace(frame_bgr)
         lab = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2LAB)
         l, a, b = cv2.split(lab)
-        l2 = self._clahe.apply(l)
+        l2 = self._equalize_l(l)
         lab2 = cv2.merge((l2, a, b))
         return cv2.cvtColor(lab2, cv2.COLOR_LAB2BGR)
 
+    def _apply_clahe_inplace(self, frame_bgr):
+        h, w = frame_bgr.shape[:2]
+        lab = self._ws.get("lab", (h, w, 3))
+        l = self._ws.get("l", (h, w))
+        l2 = self._ws.get("l2", (h, w))
+
+        cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2LAB, dst=lab)
+        cv2.extractChannel(lab, 0, dst=l)
+        self._equalize_l(l, l2)
+        cv2.insertChannel(l2, lab, 0)
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=frame_bgr)
+
+    # ---- StaticRegionSkip interface (temporal only): per-pixel mapping, no halo ----
+    region_halo = 0
+
+    def frame_params(self, frame_bgr):
+        """((frame,), (LUT table,)); the tile histograms only need a subsampled L."""
+        t = self._temporal
+        if t is None:
+            raise ValueError("Static-region skip needs temporal=True")
+        sub = cv2.cvtColor(np.ascontiguousarray(t.sample(frame_bgr)), cv2.COLOR_BGR2LAB)
+        t.update(cv2.extractChannel(sub, 0), shape=frame_bgr.shape[:2])
+        return (frame_bgr,), (t.table,)
+
+    def render_region(self, planes, params, y0, y1, x0, x1):
+        lab = cv2.cvtColor(planes[0][y0:y1, x0:x1], cv2.COLOR_BGR2LAB)
+        l2 = self._temporal.remap(cv2.extractChannel(lab, 0), y0, x0)
+        cv2.insertChannel(l2, lab, 0)
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
     def process(
         self,
         input_video: str,
         output_video: str,
         progress_cb: Optional[Callable[[int, str], None]] = None,
         cancel_cb: Optional[Callable[[], bool]] = None,
+        profiler: Optional[FrameProfiler] = None,
     ) -> str:
-        cap = cv2.VideoCapture(input_video)
-        if not cap.isOpened():
-            raise RuntimeError(f"Cannot open input video: {input_video}")
-
-        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-        w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 0
-
-        os.makedirs(os.path.dirname(output_video) or ".", exist_ok=True)
-
-        fourcc = cv2.VideoWriter_fourcc(*self.codec)
-        writer = cv2.VideoWriter(output_video, fourcc, fps, (w, h))
-        if not writer.isOpened():
-            cap.release()
-            raise RuntimeError("Cannot open VideoWriter. Try codec='XVID' and output '.avi'")
-
-        if progress_cb:
-            progress_cb(0, f"CLAHE running… {w}x{h} @ {fps:.2f} fps")
-
-        idx = 0
-        while True:
-            if cancel_cb and cancel_cb():
-                if progress_cb:
-                    progress_cb(0, "Cancelled.")
-                break
-
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            out_frame = self._apply_clahe(frame)
-            writer.write(out_frame)
-
-            idx += 1
-            if progress_cb and total > 0 and (idx % 5 == 0):
-                pct = int((idx / total) * 100)
-                progress_cb(min(100, max(0, pct)), f"Frame {idx}/{total}")
-
-        cap.release()
-        writer.release()
-
-        if progress_cb and not (cancel_cb and cancel_cb()):
-            progress_cb(100, "Done.")
+        cfg = VideoProcessConfig(
+            out_fps=None,
+            codec=self.codec,
+            pipeline=self.pipeline,
+            workers=self.workers,
+            reuse_buffers=self.reuse_buffers,
+        )
+        VideoProcessor().process(
+            input_video,
+            output_video,
+            # self carries `stateful` when temporal
+            frame_transform=StaticRegionSkip(self) if self.skip_static else self,
+            cfg=cfg,
+            progress_cb=progress_cb,
+            cancel_cb=cancel_cb,
+            profiler=profiler,
+        )
         return output_video
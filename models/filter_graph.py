@@ -0,0 +1,195 @@
+'''
+Description:
+    Declarative filter graph: a list of enhancement stages executed by
+    VideoProcessor in a single decode -> stages -> encode pass, e.g.
+
+        graph = FilterGraph.from_specs([
+            {"op": "clahe", "clip_limit": 2.5, "tile_grid_size": (8, 8)},
+            {"op": "gamma", "gamma": 0.6},
+        ])
+        graph.process("in.mp4", "out.mp4")
+
+    Consecutive LAB stages (deband, sharpen, chroma_denoise) share one
+    BGR <-> LAB conversion.
+'''
+
+import inspect
+from abc import ABC, abstractmethod
+import cv2
+import numpy as np
+from typing import Optional, Callable
+from utils.video_process import VideoProcessor, VideoProcessConfig
+from utils.profiling import FrameProfiler
+from models.hist_equa import HistogramEqualizer
+from models.clahe import CLAHEVideoProcessor
+from models.power_transformation import PowerLawVideoProcessor
+from models.retinex_temporal import TemporalRetinex, deband_L, unsharp_mask_L, denoise_chroma_lab
+
+
+class _LabStage(ABC):
+    """Stage on LAB planes, grouped by FilterGraph into one LAB round-trip."""
+    stateful = False
+
+    @abstractmethod
+    def apply_lab(self, L, A, B):
+        """(L, A, B) uint8 planes -> (L, A, B)."""
+
+
+class _Deband(_LabStage):
+    def __init__(self, sigma: float = 0.4):
+        self.sigma = float(sigma)
+
+    def apply_lab(self, L, A, B):
+        return deband_L(L, sigma=self.sigma), A, B
+
+
+class _Sharpen(_LabStage):
+    def __init__(self, amount: float = 0.55, radius: float = 1.1, threshold: float = 6.0):
+        self.amount = float(amount)
+        self.radius = float(radius)
+        self.threshold = float(threshold)
+
+    def apply_lab(self, L, A, B):
+        return unsharp_mask_L(L, amount=self.amount, radius=self.radius, threshold=self.threshold), A, B
+
+
+class _ChromaDenoise(_LabStage):
+    def __init__(self, k: int = 3):
+        self.k = int(k)
+
+    def apply_lab(self, L, A, B):
+        A2, B2 = denoise_chroma_lab(A, B, k=self.k)
+        return L, A2, B2
+
+
+class _LabGroup:
+    """Runs consecutive _LabStage's inside one LAB round-trip."""
+    stateful = False
+
+    def __init__(self, stages: list):
+        self.stages = stages
+
+    def __call__(self, frame_bgr: np.ndarray) -> np.ndarray:
+        L, A, B = cv2.split(cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2LAB))
+        for stage in self.stages:
+            L, A, B = stage.apply_lab(L, A, B)
+        return cv2.cvtColor(cv2.merge([L, A, B]), cv2.COLOR_LAB2BGR)
+
+
+def _histeq(**params):
+    # The equalizer itself is the transform so a temporal one marks the graph stateful
+    return HistogramEqualizer(**params)
+
+
+def _clahe(clip_limit: float = 2.0, tile_grid_size: tuple = (8, 8), temporal: bool = False,
+           lut_alpha: float = 0.25, drift_threshold: float = 0.02):
+    # The processor itself is the transform so a temporal one marks the graph stateful
+    return CLAHEVideoProcessor(clip_limit=clip_limit, tile_grid_size=tuple(tile_grid_size), temporal=temporal,
+                               lut_alpha=lut_alpha, drift_threshold=drift_threshold)
+
+
+def _gamma(**params):
+    return PowerLawVideoProcessor(**params).apply
+
+
+# op name -> factory(**params) returning a frame transform or a _LabStage
+STAGES = {
+    "histeq": _histeq,
+    "clahe": _clahe,
+    "gamma": _gamma,
+    "retinex": TemporalRetinex,
+    "deband": _Deband,
+    "sharpen": _Sharpen,
+    "chroma_denoise": _ChromaDenoise,
+}
+
+
+def build_stage(spec):
+    """spec: "op" or {"op": "...", **params}."""
+    if isinstance(spec, str):
+        spec = {"op": spec}
+    params = dict(spec)
+    op = params.pop("op", None)
+    if op not in STAGES:
+        raise ValueError(f"Unknown filter stage: {op!r} (expected one of {', '.join(STAGES)})")
+    return STAGES[op](**params)
+
+
+# Params that are a size in pixels of scene-scale structure (not pixel-level
+# detail like sharpen radius), scaled by scale_specs()
+SPATIAL_PARAMS = {
+    "retinex": ("sigma_retinex",),
+}
+
+
+def scale_specs(specs: list, factor: float) -> list:
+    """
+    Specs for running the graph on frames resized by `factor` (e.g. 0.5 for a
+    half-resolution preview), so it looks like the full-resolution result.
+    """
+    out = []
+    for spec in specs:
+        spec = {"op": spec} if isinstance(spec, str) else dict(spec)
+        op = spec.get("op")
+        for name in SPATIAL_PARAMS.get(op, ()):
+            value = spec.get(name)
+            if value is None:
+                value = inspect.signature(STAGES[op]).parameters[name].default
+            spec[name] = float(value) * factor
+        out.append(spec)
+    return out
+
+
+class FilterGraph:
+    """
+    Ordered chain of frame transforms, itself a frame transform.
+    stateful if any stage is (e.g. retinex), which keeps VideoProcessor on a
+    single transform thread.
+    """
+    def __init__(self, stages: list):
+        self.stages = []
+        lab_run = []
+        for stage in stages:
+            if isinstance(stage, _LabStage):
+                lab_run.append(stage)
+                continue
+            if lab_run:
+                self.stages.append(_LabGroup(lab_run))
+                lab_run = []
+            self.stages.append(stage)
+        if lab_run:
+            self.stages.append(_LabGroup(lab_run))
+
+        self.stateful = any(getattr(s, "stateful", False) for s in self.stages)
+
+    @classmethod
+    def from_specs(cls, specs: list) -> "FilterGraph":
+        return cls([build_stage(spec) for spec in specs])
+
+    def __call__(self, frame_bgr: np.ndarray) -> np.ndarray:
+        for stage in self.stages:
+            frame_bgr = stage(frame_bgr)
+        return frame_bgr
+
+    def process(
+        self,
+        in_path: str,
+        out_path: str,
+        codec: str = "mp4v",
+        pipeline: bool = True,
+        workers: int = 0,
+        progress_cb: Optional[Callable[[int, str], None]] = None,
+        cancel_cb: Optional[Callable[[], bool]] = None,
+        profiler: Optional[FrameProfiler] = None,
+    ) -> str:
+        cfg = VideoProcessConfig(out_fps=None, codec=codec, pipeline=pipeline, workers=workers)
+        VideoProcessor().process(
+            in_path,
+            out_path,
+            frame_transform=self,
+            cfg=cfg,
+            progress_cb=progress_cb,
+            cancel_cb=cancel_cb,
+            profiler=profiler,
+        )
+        return out_path
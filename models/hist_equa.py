@@ -1,12 +1,123 @@
-import cv2 
+from typing import Optional
+
+import cv2
 import numpy as np
+from utils.workspace import FrameWorkspace
+
+
+def equalize_lut(hist: np.ndarray, total: int) -> np.ndarray:
+    """The uint8 LUT cv2.equalizeHist builds from a 256-bin histogram."""
+    hist = hist.ravel().astype(np.int64)
+    lut = np.zeros(256, np.uint8)
+    first = int(np.flatnonzero(hist)[0]) if total else 0
+    if hist[first] == total:
+        lut[:] = first
+        return lut
+    scale = np.float32(255.0 / (total - hist[first]))
+    cum = np.cumsum(hist[first + 1:]).astype(np.float32) * scale
+    lut[first + 1:] = np.clip(np.rint(cum), 0, 255).astype(np.uint8)
+    return lut
+
+
+class TemporalEqualization:
+    """
+    Histogram equalization LUT for a sequence of luminance planes.
+
+    The histogram of every `sample_step`-th pixel (in both directions) is
+    blended into a normalized EMA histogram with weight `hist_alpha`. The
+    256-entry LUT is rebuilt from it only when its CDF has moved by more than
+    `drift_threshold` (largest difference, as a fraction of the pixels) since
+    the last build, so most frames cost one subsampled calcHist and a
+    cv2.LUT, and the mapping doesn't flicker.
+
+    stateful: frames must arrive in order (see VideoProcessor).
+    stats: {"frames", "lut_updates"} since the last reset().
+    """
+    stateful = True
+
+    def __init__(self, hist_alpha: float = 0.1, drift_threshold: float = 0.01, sample_step: int = 4):
+        if not 0.0 < hist_alpha <= 1.0:
+            raise ValueError("hist_alpha must be in (0, 1]")
+        self.hist_alpha = float(hist_alpha)
+        self.drift_threshold = float(drift_threshold)
+        self.sample_step = max(1, int(sample_step))
+        self.reset()
+
+    def reset(self):
+        self.stats = {"frames": 0, "lut_updates": 0}
+        self._hist = None       # normalized EMA histogram (256,)
+        self._ref_cdf = None    # CDF the current LUT was built from
+        self._lut = None
+
+    @property
+    def lut(self) -> Optional[np.ndarray]:
+        return self._lut
+
+    @staticmethod
+    def _cdf_lut(cdf: np.ndarray) -> np.ndarray:
+        """cv2.equalizeHist's mapping for a normalized CDF."""
+        lut = np.zeros(256, np.uint8)
+        first = int(np.flatnonzero(cdf > 0)[0])
+        rest = 1.0 - cdf[first]
+        if rest <= 1e-9:
+            lut[:] = first
+            return lut
+        lut[first + 1:] = np.clip(np.rint((cdf[first + 1:] - cdf[first]) * (255.0 / rest)), 0, 255)
+        return lut
+
+    def update(self, src: np.ndarray) -> np.ndarray:
+        """Blend in one plane (channel 0 of `src` is used) and return the LUT to apply."""
+        sub = src[::self.sample_step, ::self.sample_step]
+        hist = cv2.calcHist([sub], [0], None, [256], [0, 256]).ravel().astype(np.float64)
+        hist /= max(hist.sum(), 1.0)
+        if self._hist is None:
+            self._hist = hist
+        else:
+            self._hist += self.hist_alpha * (hist - self._hist)
+        self.stats["frames"] += 1
+
+        cdf = np.cumsum(self._hist)
+        if self._ref_cdf is None or np.abs(cdf - self._ref_cdf).max() > self.drift_threshold:
+            self._ref_cdf = cdf
+            self._lut = self._cdf_lut(cdf)
+            self.stats["lut_updates"] += 1
+        return self._lut
+
 
 class HistogramEqualizer:
+    """
+    reuse_buffers: take scratch planes from a FrameWorkspace and write the
+    result back into the input frame, so steady-state frames allocate nothing.
+    temporal: equalize with a LUT from an EMA of subsampled luminance
+    histograms (see TemporalEqualization) instead of each frame's own
+    histogram; steadier and cheaper, but stateful.
+    """
+    def __init__(
+        self,
+        reuse_buffers: bool = False,
+        temporal: bool = False,
+        hist_alpha: float = 0.1,
+        drift_threshold: float = 0.01,
+        sample_step: int = 4,
+    ):
+        self.reuse_buffers = reuse_buffers
+        self._ws = FrameWorkspace() if reuse_buffers else None
+        self.temporal = temporal
+        self.stateful = temporal
+        self._temporal = TemporalEqualization(
+            hist_alpha, drift_threshold, sample_step
+        ) if temporal else None
 
     def apply(self, frame_bgr: np.ndarray) -> np.ndarray:
         if frame_bgr is None:
             return frame_bgr
 
+        if self._ws is not None:
+            return self._apply_inplace(frame_bgr)
+
+        if self._temporal is not None:
+            return self._apply_temporal(frame_bgr)
+
         if len(frame_bgr.shape) == 2 or frame_bgr.shape[2] == 1:
             return cv2.equalizeHist(frame_bgr)
 
@@ -15,4 +126,61 @@ class HistogramEqualizer:
         y_eq = cv2.equalizeHist(y)
         ycrcb_eq = cv2.merge((y_eq, cr, cb))
         out = cv2.cvtColor(ycrcb_eq, cv2.COLOR_YCrCb2BGR)
-        return out
\ No newline at end of file
+        return out
+
+    __call__ = apply
+
+    def _apply_temporal(self, frame_bgr: np.ndarray) -> np.ndarray:
+        if len(frame_bgr.shape) == 2 or frame_bgr.shape[2] == 1:
+            return cv2.LUT(frame_bgr, self._temporal.update(frame_bgr))
+
+        ycrcb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2YCrCb)
+        lut = self._temporal.update(ycrcb)
+        cv2.insertChannel(cv2.LUT(cv2.extractChannel(ycrcb, 0), lut), ycrcb, 0)
+        return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
+
+    def _apply_inplace(self, frame_bgr: np.ndarray) -> np.ndarray:
+        if len(frame_bgr.shape) == 2 or frame_bgr.shape[2] == 1:
+            if self._temporal is not None:
+                return cv2.LUT(frame_bgr, self._temporal.update(frame_bgr), dst=frame_bgr)
+            return cv2.equalizeHist(frame_bgr, dst=frame_bgr)
+
+        h, w = frame_bgr.shape[:2]
+        ycrcb = self._ws.get("ycrcb", (h, w, 3))
+        y = self._ws.get("y", (h, w))
+
+        cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2YCrCb, dst=ycrcb)
+        cv2.extractChannel(ycrcb, 0, dst=y)
+        if self._temporal is not None:
+            cv2.LUT(y, self._temporal.update(ycrcb), dst=y)
+        else:
+            cv2.equalizeHist(y, dst=y)
+        cv2.insertChannel(y, ycrcb, 0)
+        return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR, dst=frame_bgr)
+
+    # ---- StaticRegionSkip interface: the LUT is applied in frame_params, so
+    # changes are compared in the output's range and only the colour
+    # conversion is left per region (no halo) ----
+    region_halo = 0
+
+    def frame_params(self, frame_bgr: np.ndarray):
+        """((equalized YCrCb or gray frame,), ())"""
+        if frame_bgr.ndim == 2:
+            src = frame_bgr
+        else:
+            src = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2YCrCb)
+        if self._temporal is not None:
+            lut = self._temporal.update(src)
+        else:
+            hist = cv2.calcHist([src], [0], None, [256], [0, 256])
+            lut = equalize_lut(hist, src.shape[0] * src.shape[1])
+        if src.ndim == 2:
+            return (cv2.LUT(src, lut),), ()
+        cv2.insertChannel(cv2.LUT(cv2.extractChannel(src, 0), lut), src, 0)
+        return (src,), ()
+
+    def render_region(self, planes, params, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        roi = planes[0][y0:y1, x0:x1]
+        if roi.ndim == 2:
+            return roi.copy()
+        return cv2.cvtColor(roi, cv2.COLOR_YCrCb2BGR)
@@ -0,0 +1,96 @@
+import cv2
+import numpy as np
+from functools import lru_cache
+from typing import Optional, Callable
+from utils.video_process import VideoProcessor, VideoProcessConfig
+from utils.profiling import FrameProfiler
+
+
+@lru_cache(maxsize=32)
+def gamma_lut(gamma: float) -> np.ndarray:
+    """s = 255 * (r / 255) ** gamma as a 256-entry uint8 LUT (gamma < 1 brightens)."""
+    if gamma <= 0:
+        raise ValueError(f"gamma must be > 0, got {gamma}")
+    x = np.arange(256, dtype=np.float64) / 255.0
+    lut = np.clip(np.round(255.0 * np.power(x, gamma)), 0, 255).astype(np.uint8)
+    lut.setflags(write=False)
+    return lut
+
+
+class PowerLawVideoProcessor:
+    """
+    Power-law (gamma) transform via cv2.LUT; no per-pixel pow() per frame.
+    channel_gammas: (b, g, r) gammas instead of one gamma for all channels.
+    luminance_only: apply gamma to L (color_space="lab") or Y ("ycrcb") only,
+    which keeps hue/saturation.
+    """
+    def __init__(
+        self,
+        gamma: float = 1.0,
+        codec: str = "mp4v",
+        channel_gammas: Optional[tuple[float, float, float]] = None,
+        luminance_only: bool = False,
+        color_space: str = "lab",
+        pipeline: bool = False,
+        workers: int = 0,
+        backend: str = "thread",
+    ):
+        if color_space not in ("lab", "ycrcb"):
+            raise ValueError(f"color_space must be 'lab' or 'ycrcb', got {color_space!r}")
+        if channel_gammas is not None and luminance_only:
+            raise ValueError("channel_gammas and luminance_only are mutually exclusive")
+
+        self.gamma = float(gamma)
+        self.codec = codec
+        self.channel_gammas = channel_gammas
+        self.luminance_only = luminance_only
+        self.color_space = color_space
+        self.pipeline = pipeline
+        self.workers = workers
+        self.backend = backend
+
+        if channel_gammas is not None:
+            # (1, 256, 3) => cv2.LUT maps each channel through its own table
+            self._lut = np.stack([gamma_lut(float(g)) for g in channel_gammas], axis=-1).reshape(1, 256, 3)
+        else:
+            self._lut = gamma_lut(self.gamma)
+
+        if color_space == "lab":
+            self._to, self._from = cv2.COLOR_BGR2LAB, cv2.COLOR_LAB2BGR
+        else:
+            self._to, self._from = cv2.COLOR_BGR2YCrCb, cv2.COLOR_YCrCb2BGR
+
+    def apply(self, frame_bgr: np.ndarray) -> np.ndarray:
+        if not self.luminance_only or frame_bgr.ndim == 2:
+            return cv2.LUT(frame_bgr, self._lut)
+
+        conv = cv2.cvtColor(frame_bgr, self._to)
+        lum = cv2.LUT(cv2.extractChannel(conv, 0), self._lut)
+        cv2.insertChannel(lum, conv, 0)
+        return cv2.cvtColor(conv, self._from)
+
+    def process(
+        self,
+        input_video: str,
+        output_video: str,
+        progress_cb: Optional[Callable[[int, str], None]] = None,
+        cancel_cb: Optional[Callable[[], bool]] = None,
+        profiler: Optional[FrameProfiler] = None,
+    ) -> str:
+        cfg = VideoProcessConfig(
+            out_fps=None,
+            codec=self.codec,
+            pipeline=self.pipeline,
+            workers=self.workers,
+            backend=self.backend,
+        )
+        VideoProcessor().process(
+            input_video,
+            output_video,
+            frame_transform=self.apply,
+            cfg=cfg,
+            progress_cb=progress_cb,
+            cancel_cb=cancel_cb,
+            profiler=profiler,
+        )
+        return output_video
@@ -8,13 +8,15 @@ class CLAHEWorker(QThread):
     finished_ok = pyqtSignal(str)   # output path
     failed = pyqtSignal(str)
 
-    def __init__(self, in_path: str, out_path: str, clip_limit: float, tile_w: int, tile_h: int, codec: str = "mp4v"):
+    def __init__(self, in_path: str, out_path: str, clip_limit: float, tile_w: int, tile_h: int, codec: str = "mp4v",
+                 temporal: bool = False):
         super().__init__()
         self.in_path = in_path
         self.out_path = out_path
         self.clip_limit = float(clip_limit)
         self.tile_grid = (int(tile_w), int(tile_h))
         self.codec = codec
+        self.temporal = temporal
         self._cancel = False
 
     def cancel(self):
@@ -25,7 +27,9 @@ class CLAHEWorker(QThread):
             processor = CLAHEVideoProcessor(
                 clip_limit=self.clip_limit,
                 tile_grid_size=self.tile_grid,
-                codec=self.codec
+                codec=self.codec,
+                pipeline=True,
+                temporal=self.temporal
             )
 
             def progress_cb(pct: int, msg: str):
@@ -24,12 +24,13 @@ class ExtractWorker(QThread):
                  output_dir: str, 
                  mode: str, 
                  value: int,
-                 ext: str = "png"):
+                 ext: str = "png",
+                 **options):
         super().__init__()
         
         self.video_path = video_path 
         self.out_dir = output_dir
-        self.cfg = ExtractConfig(mode=mode, value=value, ext= ext)
+        self.cfg = ExtractConfig(mode=mode, value=value, ext= ext, **options)
         self._cancel = False
         
     def cancel(self):
@@ -8,10 +8,11 @@ class HistEqWorker(QThread):
     finished_ok = pyqtSignal(str)   # output path
     failed = pyqtSignal(str)
 
-    def __init__(self, in_path: str, out_path: str):
+    def __init__(self, in_path: str, out_path: str, temporal: bool = False):
         super().__init__()
         self.in_path = in_path
         self.out_path = out_path
+        self.temporal = temporal
         self._cancel = False
 
     def cancel(self):
@@ -20,8 +21,8 @@ class HistEqWorker(QThread):
     def run(self):
         try:
             processor = VideoProcessor()
-            eq = HistogramEqualizer()
-            cfg = VideoProcessConfig(out_fps=None, codec="mp4v")
+            eq = HistogramEqualizer(temporal=self.temporal)
+            cfg = VideoProcessConfig(out_fps=None, codec="mp4v", pipeline=True)
 
             def progress_cb(pct: int, msg: str):
                 self.progress.emit(pct)
@@ -33,7 +34,7 @@ class HistEqWorker(QThread):
             processor.process(
                 self.in_path,
                 self.out_path,
-                frame_transform=eq.apply,
+                frame_transform=eq,
                 cfg=cfg,
                 progress_cb=progress_cb,
                 cancel_cb=cancel_cb,
@@ -0,0 +1,174 @@
+'''
+Description:
+    Queue of enhancement jobs run by the GUI. Each job wraps one worker
+    (a QThread with progress / status / failed signals and cancel()), has
+    its own progress, status and cancellation, and at most `limit` jobs run
+    at once; the rest wait in submission order.
+'''
+
+import os
+from typing import Callable, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from utils.system import available_memory_mb
+
+# Rough peak memory of one decode -> enhance -> encode job (frame queues + encoder)
+JOB_MEM_MB = 1024
+# Each job's pipelined VideoProcessor already runs os.cpu_count() transform
+# threads, so more than a couple of jobs at once only oversubscribes the cores
+DEFAULT_JOBS = 2
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+def default_concurrency(job_mem_mb: int = JOB_MEM_MB) -> int:
+    """DEFAULT_JOBS, lowered to the core count and to what the available memory can hold."""
+    limit = min(DEFAULT_JOBS, os.cpu_count() or 1)
+    avail = available_memory_mb()
+    if avail and job_mem_mb > 0:
+        limit = min(limit, avail // job_mem_mb)
+    return max(1, limit)
+
+
+class Job:
+    def __init__(self, job_id: int, title: str, factory: Callable,
+                 out_path: Optional[str] = None, kind: str = ""):
+        self.id = job_id
+        self.title = title
+        self.kind = kind            # registry name of the worker, e.g. "clahe"
+        self.factory = factory      # () -> worker, called when the job starts
+        self.out_path = out_path
+        self.state = PENDING
+        self.progress = 0
+        self.status = "Queued."
+        self.error = None
+        self.result = None          # payload of the worker's finished_ok
+        self.worker = None
+        self.cancel_requested = False
+
+    @property
+    def active(self) -> bool:
+        return self.state in (PENDING, RUNNING)
+
+
+class JobQueue(QObject):
+    added = pyqtSignal(object)       # Job
+    changed = pyqtSignal(object)     # Job (progress / status / state)
+    finished = pyqtSignal(object)    # Job, once it is done / failed / cancelled
+
+    def __init__(self, limit: Optional[int] = None, parent=None):
+        super().__init__(parent)
+        self._limit = limit if limit is not None else default_concurrency()
+        self._next_id = 1
+        self.jobs = []
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def set_limit(self, limit: int):
+        self._limit = max(1, int(limit))
+        self._start_pending()
+
+    def active_jobs(self) -> list:
+        return [j for j in self.jobs if j.active]
+
+    def running_jobs(self) -> list:
+        return [j for j in self.jobs if j.state == RUNNING]
+
+    def find_output(self, out_path: str) -> Optional[Job]:
+        """Unfinished job writing to `out_path`, if any."""
+        target = os.path.abspath(out_path)
+        for j in self.jobs:
+            if j.active and j.out_path and os.path.abspath(j.out_path) == target:
+                return j
+        return None
+
+    def submit(self, title: str, factory: Callable, out_path: Optional[str] = None, kind: str = "") -> Job:
+        """Queue a job; `factory()` builds its worker when a slot frees up."""
+        if out_path and self.find_output(out_path) is not None:
+            raise ValueError(f"Another job is already writing {out_path}")
+        job = Job(self._next_id, title, factory, out_path, kind)
+        self._next_id += 1
+        self.jobs.append(job)
+        self.added.emit(job)
+        self._start_pending()
+        return job
+
+    def cancel(self, job: Job):
+        if job.state == PENDING:
+            self._finish(job, CANCELLED, "Cancelled.")
+        elif job.state == RUNNING and job.worker is not None:
+            job.cancel_requested = True
+            job.status = "Cancelling…"
+            job.worker.cancel()
+            self.changed.emit(job)
+
+    def cancel_all(self):
+        # Pending first so cancelling a running job doesn't start one of them
+        for job in [j for j in self.jobs if j.state == PENDING]:
+            self.cancel(job)
+        for job in self.running_jobs():
+            self.cancel(job)
+
+    def remove_finished(self):
+        self.jobs = [j for j in self.jobs if j.active]
+
+    def wait(self):
+        """Block until running workers exit (after cancel_all, on shutdown)."""
+        for job in self.running_jobs():
+            job.worker.wait()
+
+    def _start_pending(self):
+        for job in self.jobs:
+            if len(self.running_jobs()) >= self._limit:
+                return
+            if job.state == PENDING:
+                self._start(job)
+
+    def _start(self, job: Job):
+        try:
+            worker = job.factory()
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, FAILED, job.error)
+            return
+        job.worker = worker
+        job.state = RUNNING
+        job.status = "Starting…"
+        worker.progress.connect(lambda pct, j=job: self._on_progress(j, pct))
+        worker.status.connect(lambda msg, j=job: self._on_status(j, msg))
+        worker.finished_ok.connect(lambda result, j=job: setattr(j, "result", result))
+        worker.failed.connect(lambda msg, j=job: setattr(j, "error", msg))
+        worker.finished.connect(lambda j=job: self._on_exit(j))
+        self.changed.emit(job)
+        worker.start()
+
+    def _on_progress(self, job: Job, pct: int):
+        job.progress = int(pct)
+        self.changed.emit(job)
+
+    def _on_status(self, job: Job, msg: str):
+        if job.state == RUNNING:
+            job.status = msg
+            self.changed.emit(job)
+
+    def _on_exit(self, job: Job):
+        worker, job.worker = job.worker, None
+        if worker is not None:
+            worker.deleteLater()
+        if job.error is not None:
+            self._finish(job, FAILED, job.error)
+        elif job.cancel_requested:
+            self._finish(job, CANCELLED, "Cancelled.")
+        else:
+            job.progress = 100
+            self._finish(job, DONE, "Done.")
+
+    def _finish(self, job: Job, state: str, status: str):
+        job.state = state
+        job.status = status
+        self.changed.emit(job)
+        self.finished.emit(job)
+        self._start_pending()
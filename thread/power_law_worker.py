@@ -21,7 +21,7 @@ class PowerLawWorker(QThread):
 
     def run(self):
         try:
-            processor = PowerLawVideoProcessor(gamma=self.gamma, codec=self.codec)
+            processor = PowerLawVideoProcessor(gamma=self.gamma, codec=self.codec, pipeline=True)
 
             def progress_cb(pct: int, msg: str):
                 self.progress.emit(pct)
@@ -0,0 +1,45 @@
+'''
+Description:
+    Lazy registry of enhancement workers. The GUI refers to backends by name
+    and a backend's module (and through it cv2 / numpy / the model) is only
+    imported the first time it is used, so startup stays fast and a broken
+    backend only disables its own button.
+'''
+
+import importlib
+
+# name -> (module, class)
+WORKERS = {
+    "extract": ("thread.extract_worker", "ExtractWorker"),
+    "histeq": ("thread.histeq_worker", "HistEqWorker"),
+    "clahe": ("thread.clahe_worker", "CLAHEWorker"),
+    "power_law": ("thread.power_law_worker", "PowerLawWorker"),
+    "graph": ("thread.graph_worker", "FilterGraphWorker"),
+}
+
+_loaded = {}
+
+
+def register(name: str, module: str, attr: str) -> None:
+    WORKERS[name] = (module, attr)
+    _loaded.pop(name, None)
+
+
+def get_worker(name: str) -> type:
+    """Worker class for `name`, importing its module on first use. Raises ImportError if it cannot be loaded."""
+    cls = _loaded.get(name)
+    if cls is not None:
+        return cls
+    if name not in WORKERS:
+        raise KeyError(f"Unknown worker: {name!r} (expected one of {', '.join(WORKERS)})")
+    module, attr = WORKERS[name]
+    try:
+        cls = getattr(importlib.import_module(module), attr)
+    except (ImportError, AttributeError) as e:
+        raise ImportError(f"Backend {name!r} is unavailable: {e}") from e
+    _loaded[name] = cls
+    return cls
+
+
+def is_loaded(name: str) -> bool:
+    return name in _loaded
@@ -0,0 +1,142 @@
+'''
+Description:
+    Background decoding of preview frames, pre-scaled to the size they are
+    shown at, with a byte-budgeted LRU of the results keyed by (index, size).
+'''
+
+from typing import Callable, Optional
+
+import cv2
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+from ui.image_cache import LRUCache
+from ui.thumbnail_model import bgr_to_qimage
+
+
+def fit_size(w: int, h: int, box_w: int, box_h: int) -> tuple[int, int]:
+    """(w, h) scaled to fit inside the box, keeping the aspect ratio."""
+    s = min(box_w / max(1, w), box_h / max(1, h))
+    return max(1, int(round(w * s))), max(1, int(round(h * s)))
+
+
+class _Relay(QObject):
+    loaded = pyqtSignal(int, object, int, int, QImage)  # generation, job key, source w, source h, image
+
+
+class _FrameJob(QRunnable):
+    def __init__(self, relay, gen, key, idx, box, load_fn):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.relay = relay
+        self.gen = gen
+        self.key = key
+        self.idx = idx
+        self.box = box
+        self.load_fn = load_fn
+
+    def run(self):
+        qimg = QImage()
+        w = h = 0
+        try:
+            bgr = self.load_fn(self.idx)
+            if bgr is not None:
+                h, w = bgr.shape[:2]
+                tw, th = fit_size(w, h, *self.box)
+                interp = cv2.INTER_AREA if tw < w else cv2.INTER_LINEAR
+                qimg = bgr_to_qimage(cv2.resize(bgr, (tw, th), interpolation=interp))
+        except Exception:
+            pass
+        try:
+            self.relay.loaded.emit(self.gen, self.key, w, h, qimg)
+        except RuntimeError:  # loader already destroyed
+            pass
+
+
+class FrameLoader(QObject):
+    """
+    get(idx, box) returns a cached QPixmap fitted to box=(w, h) or None;
+    request(idx, box) decodes it on the pool and emits ready(idx) once it is
+    cached. Entries are keyed by the fitted size, so boxes that fit a frame
+    to the same size share one entry. set_source() bumps a generation so
+    decodes for the previous frame list are discarded.
+    """
+    ready = pyqtSignal(int)
+
+    def __init__(self, max_bytes: int = 256 << 20, threads: int = 2, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, threads))
+        self.cache = LRUCache(max_bytes, cost=lambda pix: pix.width() * pix.height() * 4)
+        self._load_fn = None
+        self._gen = 0
+        self._pending = {}   # key -> job
+        self._src_size = {}  # idx -> decoded (w, h)
+        self._last_size = None
+        self._relay = _Relay(self)
+        self._relay.loaded.connect(self._on_loaded)
+
+    def set_source(self, load_fn: Optional[Callable]) -> None:
+        self.cancel_queued()
+        self._gen += 1
+        self._pending.clear()
+        self._src_size.clear()
+        self._last_size = None
+        self.cache.clear()
+        self._load_fn = load_fn
+
+    def _key(self, idx: int, box: tuple[int, int]) -> tuple:
+        src = self._src_size.get(idx, self._last_size)
+        if src is None:  # nothing decoded yet
+            return (idx, "box") + tuple(box)
+        return (idx,) + fit_size(src[0], src[1], box[0], box[1])
+
+    def get(self, idx: int, box: tuple[int, int]) -> Optional[QPixmap]:
+        return self.cache.get(self._key(idx, box))
+
+    def get_any(self, idx: int) -> Optional[QPixmap]:
+        """Largest cached pixmap of frame idx, at whatever size it was decoded for."""
+        best = None
+        for key in self.cache.keys():
+            if key[0] == idx:
+                pix = self.cache.get(key)
+                if pix is not None and (best is None or pix.width() > best.width()):
+                    best = pix
+        return best
+
+    def put_scaled(self, idx: int, box: tuple[int, int], src: QPixmap) -> QPixmap:
+        """
+        Rescale an already decoded pixmap to box (no decode). Downscales are
+        cached under the new size; upscales are returned only, so a sharp
+        decode can still be requested for that size.
+        """
+        pix = src.scaled(box[0], box[1], Qt.AspectRatioMode.KeepAspectRatio,
+                         Qt.TransformationMode.SmoothTransformation)
+        if pix.width() <= src.width():
+            self.cache.put((idx, pix.width(), pix.height()), pix)
+        return pix
+
+    def request(self, idx: int, box: tuple[int, int], priority: int = 0) -> None:
+        key = self._key(idx, box)
+        if self._load_fn is None or key in self._pending or key in self.cache:
+            return
+        job = _FrameJob(self._relay, self._gen, key, idx, tuple(box), self._load_fn)
+        self._pending[key] = job
+        self.pool.start(job, priority)
+
+    def cancel_queued(self) -> None:
+        """Drop decodes that have not started yet."""
+        for key, job in list(self._pending.items()):
+            if self.pool.tryTake(job):
+                del self._pending[key]
+
+    def _on_loaded(self, gen: int, key: tuple, w: int, h: int, qimg: QImage) -> None:
+        if gen != self._gen:
+            return
+        self._pending.pop(key, None)
+        idx = key[0]
+        if qimg.isNull():
+            return
+        self._src_size[idx] = self._last_size = (w, h)
+        self.cache.put((idx, qimg.width(), qimg.height()), QPixmap.fromImage(qimg))
+        self.ready.emit(idx)
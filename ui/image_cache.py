@@ -0,0 +1,154 @@
+'''
+Description:
+    Caches for the preview pages: a byte-budgeted in-memory LRU and an
+    on-disk thumbnail cache (also LRU, bounded by total size).
+'''
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "video_enhancer", "thumbs")
+
+
+class LRUCache:
+    """
+    Least-recently-used cache holding at most max_bytes, as measured by
+    cost(value). Thread-safe.
+    """
+    def __init__(self, max_bytes: int, cost: Callable[[object], int]):
+        self.max_bytes = max(0, int(max_bytes))
+        self.cost = cost
+        self.bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key, value) -> None:
+        size = int(self.cost(value))
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, s) = self._items.popitem(last=False)
+                self.bytes -= s
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._items)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+
+class DiskThumbCache:
+    """
+    JPEG thumbnails keyed by an arbitrary string (callers include whatever
+    invalidates the thumbnail, e.g. source path + mtime + thumb size).
+    Hits refresh the file's mtime; when the directory grows past max_bytes
+    the oldest files are removed. Safe to use from worker threads.
+    """
+    def __init__(self, root: Optional[str] = None, max_bytes: int = 256 << 20, quality: int = 85):
+        self.root = root or default_cache_dir()
+        self.max_bytes = int(max_bytes)
+        self.quality = int(quality)
+        self._lock = threading.Lock()
+        self._approx_bytes = None
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        h = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, h[:2], h + ".jpg")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+        img = cv2.imread(path, cv2.IMREAD_COLOR)
+        if img is not None:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return img
+
+    def put(self, key: str, bgr: np.ndarray) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        ok, buf = cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(buf.tobytes())
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._scan_size()
+            self._approx_bytes += buf.size
+            if self._approx_bytes > self.max_bytes:
+                self._approx_bytes = self._evict()
+
+    def _files(self) -> list:
+        out = []
+        for dirpath, _, names in os.walk(self.root):
+            for n in names:
+                if n.endswith(".jpg"):
+                    p = os.path.join(dirpath, n)
+                    try:
+                        st = os.stat(p)
+                    except OSError:
+                        continue
+                    out.append((st.st_mtime, st.st_size, p))
+        return out
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._files())
+
+    def _evict(self) -> int:
+        """Drop oldest files until the cache is at 80% of max_bytes; returns the new size."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = int(self.max_bytes * 0.8)
+        for _, size, p in files:
+            if total <= target:
+                break
+            try:
+                os.remove(p)
+                total -= size
+            except OSError:
+                pass
+        return total
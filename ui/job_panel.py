@@ -0,0 +1,95 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox, QPushButton,
+    QProgressBar, QTreeWidget, QTreeWidgetItem, QHeaderView
+)
+
+from thread.job_queue import JobQueue, Job, FAILED
+
+
+class JobListPanel(QWidget):
+    """One row per job (title, status, progress, cancel) plus the concurrency limit."""
+
+    COLUMNS = ("Job", "Status", "Progress", "")
+
+    def __init__(self, queue: JobQueue, parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        self._rows = {}     # job id -> (item, progress bar, cancel button)
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(0, 0, 0, 0)
+
+        top = QHBoxLayout()
+        self.summary = QLabel("No jobs.")
+        self.limit_spin = QSpinBox()
+        self.limit_spin.setRange(1, 64)
+        self.limit_spin.setValue(queue.limit)
+        self.limit_spin.setToolTip("Jobs rendered at the same time (default: 2, capped by cores and free memory)")
+        self.limit_spin.valueChanged.connect(queue.set_limit)
+        self.cancel_all_btn = QPushButton("Cancel All")
+        self.cancel_all_btn.clicked.connect(queue.cancel_all)
+        self.clear_btn = QPushButton("Clear Finished")
+        self.clear_btn.clicked.connect(self.clear_finished)
+        top.addWidget(self.summary, 1)
+        top.addWidget(QLabel("Parallel jobs:"))
+        top.addWidget(self.limit_spin)
+        top.addWidget(self.cancel_all_btn)
+        top.addWidget(self.clear_btn)
+        root.addLayout(top)
+
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(len(self.COLUMNS))
+        self.tree.setHeaderLabels(self.COLUMNS)
+        self.tree.setRootIsDecorated(False)
+        header = self.tree.header()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+        header.setStretchLastSection(False)
+        self.tree.setColumnWidth(0, 260)
+        self.tree.setColumnWidth(2, 140)
+        root.addWidget(self.tree)
+
+        queue.added.connect(self.add_job)
+        queue.changed.connect(self.update_job)
+        self._update_summary()
+
+    def add_job(self, job: Job):
+        item = QTreeWidgetItem([f"#{job.id} {job.title}", job.status, "", ""])
+        item.setToolTip(0, job.out_path or job.title)
+        self.tree.addTopLevelItem(item)
+
+        bar = QProgressBar()
+        bar.setRange(0, 100)
+        btn = QPushButton("Cancel")
+        btn.clicked.connect(lambda _=False, j=job: self.queue.cancel(j))
+        self.tree.setItemWidget(item, 2, bar)
+        self.tree.setItemWidget(item, 3, btn)
+        self._rows[job.id] = (item, bar, btn)
+        self.update_job(job)
+
+    def update_job(self, job: Job):
+        row = self._rows.get(job.id)
+        if row is None:
+            return
+        item, bar, btn = row
+        item.setText(1, f"Failed: {job.status}" if job.state == FAILED else job.status)
+        item.setToolTip(1, job.status)
+        bar.setValue(job.progress)
+        btn.setEnabled(job.active and not job.cancel_requested)
+        self._update_summary()
+
+    def clear_finished(self):
+        self.queue.remove_finished()
+        keep = {j.id for j in self.queue.jobs}
+        for job_id in [k for k in self._rows if k not in keep]:
+            item, _, _ = self._rows.pop(job_id)
+            self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(item))
+        self._update_summary()
+
+    def _update_summary(self):
+        running = len(self.queue.running_jobs())
+        queued = len(self.queue.active_jobs()) - running
+        self.summary.setText(f"{running} running, {queued} queued" if running or queued else "No jobs running.")
+        self.cancel_all_btn.setEnabled(bool(running or queued))
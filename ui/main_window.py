@@ -1,21 +1,22 @@
 import os
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QSpinBox,
-    QPushButton, QFileDialog, QProgressBar, QMessageBox, QDoubleSpinBox
+    QPushButton, QFileDialog, QProgressBar, QMessageBox, QDoubleSpinBox, QCheckBox
 )
 from ui.widgets import path_picker_row
-from thread.extract_worker import ExtractWorker
-
-#Histogram of euqualization
-from thread.histeq_worker import HistEqWorker
-from thread.clahe_worker import CLAHEWorker
-from thread.power_law_worker import PowerLawWorker
+from ui.job_panel import JobListPanel
+from thread.job_queue import JobQueue, DONE, FAILED
+# Workers (and the cv2 / numpy / model imports behind them) load on first use
+from thread import registry
 
 class MainWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Video Enhancer - Step 1: Extract Frames")
-        self.worker = None
+        self.jobs = JobQueue(parent=self)
+        self.jobs.changed.connect(self.on_job_changed)
+        self.jobs.finished.connect(self.on_job_finished)
+        self.live_preview = None
 
         root = QVBoxLayout(self)
 
@@ -46,7 +47,7 @@ class MainWindow(QWidget):
         # Buttons
         btn_row = QHBoxLayout()
         self.start_btn = QPushButton("Start")
-        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn = QPushButton("Cancel Extraction")
         self.cancel_btn.setEnabled(False)
         self.start_btn.clicked.connect(self.start_extract)
         self.cancel_btn.clicked.connect(self.cancel_extract)
@@ -69,6 +70,10 @@ class MainWindow(QWidget):
         h2 = QHBoxLayout()
         self.histeq_btn = QPushButton("Histogram Equalization → Video")
         self.histeq_btn.clicked.connect(self.run_histeq)
+        self.histeq_temporal = QCheckBox("Temporal")
+        self.histeq_temporal.setToolTip("Equalize with a histogram smoothed across frames: no brightness flicker")
+        h2.addWidget(self.histeq_temporal)
+        h2.addStretch(1)
         h2.addWidget(self.histeq_btn)
         root.addLayout(h2)
 
@@ -89,6 +94,9 @@ class MainWindow(QWidget):
         self.clahe_th.setRange(1, 64)
         self.clahe_th.setValue(8)
 
+        self.clahe_temporal = QCheckBox("Temporal")
+        self.clahe_temporal.setToolTip("Keep tile mappings across frames: steadier output on mostly static footage")
+
         self.btn_clahe = QPushButton("CLAHE Enhance → Video")
         self.btn_clahe.clicked.connect(self.run_clahe)
 
@@ -98,6 +106,7 @@ class MainWindow(QWidget):
         clahe_row.addWidget(self.clahe_tw)
         clahe_row.addWidget(QLabel("x"))
         clahe_row.addWidget(self.clahe_th)
+        clahe_row.addWidget(self.clahe_temporal)
         clahe_row.addStretch(1)
         clahe_row.addWidget(self.btn_clahe)
 
@@ -122,73 +131,103 @@ class MainWindow(QWidget):
 
         root.addLayout(power_row)
 
-        
-    def run_powerlaw(self):
-        in_path = self.video_edit.text().strip()
+        #Chain: CLAHE + Gamma in one decode/encode pass
+        chain_row = QHBoxLayout()
+        self.btn_chain = QPushButton("CLAHE → Gamma (one pass) → Video")
+        self.btn_chain.clicked.connect(self.run_chain)
+        self.btn_live = QPushButton("Live Preview…")
+        self.btn_live.clicked.connect(self.open_live_preview)
+        chain_row.addWidget(self.btn_live)
+        chain_row.addStretch(1)
+        chain_row.addWidget(self.btn_chain)
+        root.addLayout(chain_row)
+
+        # Jobs: every button queues one; `Parallel jobs` of them render at a time
+        self.job_panel = JobListPanel(self.jobs)
+        root.addWidget(self.job_panel, 1)
+
+
+    def worker_class(self, name: str):
+        """Worker class from the lazy registry, or None (after telling the user) if its backend fails to import."""
+        try:
+            return registry.get_worker(name)
+        except ImportError as e:
+            QMessageBox.critical(self, "Unavailable", str(e))
+            return None
+
+    def submit_job(self, kind: str, title: str, out_path: str, *args, **kwargs):
+        """Queue a `kind` worker built from args when its turn comes. Returns the Job or None."""
+        worker_cls = self.worker_class(kind)
+        if worker_cls is None:
+            return None
+        try:
+            job = self.jobs.submit(title, lambda: worker_cls(*args, **kwargs), out_path=out_path, kind=kind)
+        except ValueError as e:
+            QMessageBox.warning(self, "Busy", str(e))
+            return None
+        self.status.setText(f"#{job.id} {title}: {job.status}")
+        self.update_progress()
+        return job
+
+    def on_job_changed(self, job):
+        self.status.setText(f"#{job.id} {job.title}: {job.status}")
+        self.update_progress()
+        if job.kind == "extract":
+            self.set_running(any(j.kind == "extract" for j in self.jobs.active_jobs()))
+
+    def on_job_finished(self, job):
+        if job.state == FAILED:
+            QMessageBox.critical(self, "Error", f"#{job.id} {job.title}\n\n{job.error}")
+        elif job.state == DONE:
+            done = f"saved {job.result} frames" if job.kind == "extract" else f"saved {job.result}"
+            self.status.setText(f"#{job.id} {job.title}: {done}")
+
+    def update_progress(self):
+        """Overall bar: mean progress of the unfinished jobs."""
+        active = self.jobs.active_jobs()
+        self.progress.setValue(sum(j.progress for j in active) // len(active) if active else 0)
+
+    def form_paths(self, need_file: bool = False):
+        """(video path, output folder) from the form, or None after warning the user."""
+        video_path = self.video_edit.text().strip()
         out_dir = self.out_edit.text().strip()
-
-        if not in_path:
-            QMessageBox.warning(self, "Missing", "Please choose a video file.")
-            return
+        if not video_path or (need_file and not os.path.isfile(video_path)):
+            QMessageBox.warning(self, "Missing", "Please choose a valid video file.")
+            return None
         if not out_dir:
             QMessageBox.warning(self, "Missing", "Please choose an output folder.")
-            return
-
-        gamma = float(self.gamma_spin.value())
-        out_path = os.path.join(out_dir, f"powerlaw_gamma_{gamma:.2f}.mp4")
-
-        self.worker = PowerLawWorker(in_path, out_path, gamma=gamma, codec="mp4v")
-        self.worker.progress.connect(self.progress.setValue)
-        self.worker.status.connect(self.status.setText)
-        self.worker.finished_ok.connect(self.on_powerlaw_done)
-        self.worker.failed.connect(self.on_powerlaw_fail)
+            return None
+        return video_path, out_dir
 
-        self.progress.setValue(0)
-        self.status.setText("Starting power-law enhancement…")
-        self.set_running(True)
-        self.worker.finished.connect(lambda: self.set_running(False))
-        self.worker.start()
+    @staticmethod
+    def output_path(video_path: str, out_dir: str, suffix: str) -> str:
+        # Named after the input and the parameters so variants and videos don't collide
+        stem = os.path.splitext(os.path.basename(video_path))[0]
+        return os.path.join(out_dir, f"{stem}_{suffix}.mp4")
 
-        
-    def run_powerlaw(self):
+    def open_live_preview(self):
         in_path = self.video_edit.text().strip()
-        out_dir = self.out_edit.text().strip()
-
-        if not in_path:
-            QMessageBox.warning(self, "Missing", "Please choose a video file.")
-            return
-        if not out_dir:
-            QMessageBox.warning(self, "Missing", "Please choose an output folder.")
-            return
-
-        gamma = float(self.gamma_spin.value())
-        out_path = os.path.join(out_dir, f"powerlaw_gamma_{gamma:.2f}.mp4")
-
-        self.worker = PowerLawWorker(in_path, out_path, gamma=gamma, codec="mp4v")
-        self.worker.progress.connect(self.progress.setValue)
-        self.worker.status.connect(self.status.setText)
-        self.worker.finished_ok.connect(self.on_powerlaw_done)
-        self.worker.failed.connect(self.on_powerlaw_fail)
-
-        self.progress.setValue(0)
-        self.status.setText("Starting power-law enhancement…")
-        self.set_running(True)
-        self.worker.finished.connect(lambda: self.set_running(False))
-        self.worker.start()
-
-    def on_powerlaw_done(self, out_path: str):
-        QMessageBox.information(self, "Done", f"Saved: {out_path}")
-        self.worker = None
-
-    def on_powerlaw_fail(self, msg: str):
-        QMessageBox.critical(self, "Error", msg)
-        self.worker = None
-
-        
-        
-        
-        
-        
+        if self.live_preview is None:
+            try:
+                from ui.pages.live_preview_page import LivePreviewPage
+            except ImportError as e:
+                QMessageBox.critical(self, "Unavailable", f"Live preview is unavailable: {e}")
+                return
+            self.live_preview = LivePreviewPage()
+            # Start from the main window's settings
+            self.live_preview.clip_spin.setValue(self.clahe_clip.value())
+            self.live_preview.tile_spin.setValue(self.clahe_tw.value())
+            self.live_preview.gamma_spin.setValue(self.gamma_spin.value())
+        if in_path and os.path.isfile(in_path) and in_path != self.live_preview.video_path:
+            self.live_preview.load_video(in_path)
+        self.live_preview.show()
+        self.live_preview.raise_()
+
+    def closeEvent(self, event):
+        # Workers are QThreads owned by the jobs; let them stop before the window goes
+        self.jobs.cancel_all()
+        self.jobs.wait()
+        super().closeEvent(event)
 
     def choose_video(self):
         path, _ = QFileDialog.getOpenFileName(
@@ -203,113 +242,75 @@ class MainWindow(QWidget):
             self.out_edit.setText(folder)
 
     def set_running(self, running: bool):
-        self.start_btn.setEnabled(not running)
+        # Settings are captured per job, so Start stays available to queue more
         self.cancel_btn.setEnabled(running)
-        self.mode_combo.setEnabled(not running)
-        self.n_spin.setEnabled(not running)
 
     def start_extract(self):
-        video_path = self.video_edit.text().strip()
-        out_dir = self.out_edit.text().strip()
-
-        if not video_path or not os.path.isfile(video_path):
-            QMessageBox.warning(self, "Missing", "Please choose a valid video file.")
+        paths = self.form_paths(need_file=True)
+        if paths is None:
             return
-        if not out_dir:
-            QMessageBox.warning(self, "Missing", "Please choose an output folder.")
-            return
-
+        video_path, out_dir = paths
         mode = self.mode_combo.currentData()
         n = int(self.n_spin.value())
-
-        self.worker = ExtractWorker(video_path, out_dir, mode, n, ext="png")
-        self.worker.progress.connect(self.progress.setValue)
-        self.worker.status.connect(self.status.setText)
-        self.worker.finished_ok.connect(self.on_done)
-        self.worker.failed.connect(self.on_fail)
-
-        self.progress.setValue(0)
-        self.status.setText("Starting…")
-        self.set_running(True)
-        self.worker.start()
+        title = f"Extract ({mode} {n}) — {os.path.basename(video_path)}"
+        self.submit_job("extract", title, out_dir, video_path, out_dir, mode, n, ext="png")
 
     def cancel_extract(self):
-        if self.worker:
-            self.worker.cancel()
-            self.set_running(False)
+        for job in self.jobs.active_jobs():
+            if job.kind == "extract":
+                self.jobs.cancel(job)
 
-    def on_done(self, saved: int):
-        self.set_running(False)
-        QMessageBox.information(self, "Done", f"Saved {saved} frames.")
-        self.worker = None
-
-    def on_fail(self, msg: str):
-        self.set_running(False)
-        QMessageBox.critical(self, "Error", msg)
-        self.worker = None
-
-    
     #Run histogram of equalization
     def run_histeq(self):
-        video_path = self.video_edit.text().strip()
-        out_dir = self.out_edit.text().strip()
-
-        if not video_path:
-            QMessageBox.warning(self, "Missing", "Choose a video first.")
-            return
-        if not out_dir:
-            QMessageBox.warning(self, "Missing", "Choose an output folder.")
+        paths = self.form_paths()
+        if paths is None:
             return
+        in_path, out_dir = paths
+        temporal = self.histeq_temporal.isChecked()
+        out_path = self.output_path(in_path, out_dir, "histeq_temporal" if temporal else "histeq")
+        title = f"Histogram EQ{' temporal' if temporal else ''} — {os.path.basename(in_path)}"
+        self.submit_job("histeq", title, out_path, in_path, out_path, temporal=temporal)
 
-        out_path = os.path.join(out_dir, "histeq_enhanced.mp4")
-
-        self.worker = HistEqWorker(video_path, out_path)
-        self.worker.progress.connect(self.progress.setValue)
-        self.worker.status.connect(self.status.setText)
-        self.worker.finished_ok.connect(lambda p: QMessageBox.information(self, "Done", f"Saved: {p}"))
-        self.worker.failed.connect(lambda m: QMessageBox.critical(self, "Error", m))
-
-        self.progress.setValue(0)
-        self.status.setText("Starting histogram equalization…")
-        self.set_running(True)
-        self.worker.finished.connect(lambda: self.set_running(False))
-        self.worker.start()
-
-        
     #Run CLAHE
     def run_clahe(self):
-        in_path = self.video_edit.text().strip()
-        out_dir = self.out_edit.text().strip()
-
-        if not in_path:
-            QMessageBox.warning(self, "Missing", "Please choose a video file.")
-            return
-        if not out_dir:
-            QMessageBox.warning(self, "Missing", "Please choose an output folder.")
+        paths = self.form_paths()
+        if paths is None:
             return
-
+        in_path, out_dir = paths
         clip = float(self.clahe_clip.value())
         tw = int(self.clahe_tw.value())
         th = int(self.clahe_th.value())
+        temporal = self.clahe_temporal.isChecked()
+        tag = "_temporal" if temporal else ""
+        out_path = self.output_path(in_path, out_dir, f"clahe_{clip:.1f}_{tw}x{th}{tag}")
+        title = f"CLAHE {clip:.1f} {tw}x{th}{' temporal' if temporal else ''} — {os.path.basename(in_path)}"
+        self.submit_job("clahe", title, out_path, in_path, out_path, clip, tw, th, codec="mp4v", temporal=temporal)
 
-        out_path = os.path.join(out_dir, "clahe_enhanced.mp4")
-
-        # Create worker
-        self.worker = CLAHEWorker(in_path, out_path, clip, tw, th, codec="mp4v")
-        self.worker.progress.connect(self.progress.setValue)
-        self.worker.status.connect(self.status.setText)
-        self.worker.finished_ok.connect(self.on_clahe_done)
-        self.worker.failed.connect(self.on_clahe_fail)
-
-        self.progress.setValue(0)
-        self.status.setText("Starting CLAHE…")
-        self.set_running(True)     # reuse your existing function (start/cancel disable)
-        self.worker.finished.connect(lambda: self.set_running(False))
-        self.worker.start()
-    def on_clahe_done(self, out_path: str):
-        QMessageBox.information(self, "Done", f"Saved: {out_path}")
-        self.worker = None
-
-    def on_clahe_fail(self, msg: str):
-        QMessageBox.critical(self, "Error", msg)
-        self.worker = None
+    def run_powerlaw(self):
+        paths = self.form_paths()
+        if paths is None:
+            return
+        in_path, out_dir = paths
+        gamma = float(self.gamma_spin.value())
+        out_path = self.output_path(in_path, out_dir, f"powerlaw_gamma_{gamma:.2f}")
+        title = f"Gamma {gamma:.2f} — {os.path.basename(in_path)}"
+        self.submit_job("power_law", title, out_path, in_path, out_path, gamma=gamma, codec="mp4v")
+
+    #Run CLAHE -> Gamma as one filter graph
+    def run_chain(self):
+        paths = self.form_paths()
+        if paths is None:
+            return
+        in_path, out_dir = paths
+        clip = float(self.clahe_clip.value())
+        tile = (int(self.clahe_tw.value()), int(self.clahe_th.value()))
+        gamma = float(self.gamma_spin.value())
+        temporal = self.clahe_temporal.isChecked()
+        specs = [
+            {"op": "clahe", "clip_limit": clip, "tile_grid_size": tile, "temporal": temporal},
+            {"op": "gamma", "gamma": gamma},
+        ]
+        tag = "_temporal" if temporal else ""
+        out_path = self.output_path(in_path, out_dir, f"clahe_{clip:.1f}_{tile[0]}x{tile[1]}{tag}_gamma_{gamma:.2f}")
+        title = f"CLAHE {clip:.1f} → Gamma {gamma:.2f} — {os.path.basename(in_path)}"
+        self.submit_job("graph", title, out_path, in_path, out_path, specs, codec="mp4v")
@@ -0,0 +1,312 @@
+import threading
+import time
+
+import cv2
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QPushButton, QFileDialog,
+    QComboBox, QDoubleSpinBox, QSpinBox, QSizePolicy
+)
+
+from models.filter_graph import FilterGraph, scale_specs
+from ui.thumbnail_model import bgr_to_qimage
+
+# Combo label -> specs(page) for the graph being tuned
+FILTERS = {
+    "CLAHE": lambda p: [p.clahe_spec()],
+    "Gamma": lambda p: [p.gamma_spec()],
+    "CLAHE → Gamma": lambda p: [p.clahe_spec(), p.gamma_spec()],
+    "Retinex": lambda p: [p.retinex_spec()],
+    "Histogram equalization": lambda p: ["histeq"],
+}
+
+PREVIEW_SCALES = (("1/4 res", 0.25), ("1/2 res", 0.5), ("Full res", 1.0))
+
+
+class LiveRenderer(QThread):
+    """
+    Renders (original, enhanced) for one source frame at a time. submit()
+    replaces any request not yet started, and a running render stops between
+    graph stages once a newer request arrives, so only the latest parameters
+    are ever finished. The capture lives on this thread; the last decoded
+    frame is kept so parameter changes do not decode again.
+    """
+    rendered = pyqtSignal(int, QImage, QImage, float)  # request id, original, enhanced, ms
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, video_path: str, parent=None):
+        super().__init__(parent)
+        self.video_path = video_path
+        self._cond = threading.Condition()
+        self._request = None
+        self._latest = 0
+        self._stop = False
+
+    def submit(self, frame_idx: int, specs: list, scale: float) -> int:
+        with self._cond:
+            self._latest += 1
+            self._request = (self._latest, int(frame_idx), list(specs), float(scale))
+            self._cond.notify()
+            return self._latest
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        self.wait()
+
+    def _superseded(self, rid: int) -> bool:
+        return self._stop or self._latest != rid
+
+    def run(self):
+        cap = cv2.VideoCapture(self.video_path)
+        pos = -1         # index of the frame the next read() returns
+        cached = None    # (frame_idx, scale, small_bgr)
+        try:
+            while True:
+                with self._cond:
+                    while self._request is None and not self._stop:
+                        self._cond.wait()
+                    if self._stop:
+                        return
+                    rid, frame_idx, specs, scale = self._request
+                    self._request = None
+
+                try:
+                    t0 = time.perf_counter()
+                    if cached is None or cached[:2] != (frame_idx, scale):
+                        if frame_idx != pos:
+                            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                        ok, frame = cap.read()
+                        pos = frame_idx + 1 if ok else -1
+                        if not ok:
+                            self.failed.emit(rid, f"Could not read frame {frame_idx}")
+                            continue
+                        if scale != 1.0:
+                            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                        cached = (frame_idx, scale, frame)
+                    src = cached[2]
+                    if self._superseded(rid):
+                        continue
+
+                    # Fresh graph per render: stateful stages (retinex EMA) must not
+                    # carry state between unrelated frames
+                    graph = FilterGraph.from_specs(scale_specs(specs, scale))
+                    out = src.copy()
+                    for stage in graph.stages:
+                        if self._superseded(rid):
+                            break
+                        out = stage(out)
+                    else:
+                        ms = (time.perf_counter() - t0) * 1000.0
+                        self.rendered.emit(rid, bgr_to_qimage(src), bgr_to_qimage(out), ms)
+                except Exception as e:
+                    self.failed.emit(rid, str(e))
+        finally:
+            cap.release()
+
+
+class LivePreviewPage(QWidget):
+    """
+    Side-by-side original / enhanced view of one source frame, re-rendered
+    at reduced resolution on every parameter change.
+    """
+    def __init__(self, video_path: str = "", parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Video Enhancer - Live Preview")
+        self.video_path = ""
+        self.frame_count = 0
+        self.renderer = None
+        self._latest_id = 0
+        self._images = (None, None)
+
+        root = QVBoxLayout(self)
+
+        # Source
+        top = QHBoxLayout()
+        self.video_label = QLabel("Video: (none)")
+        self.btn_open = QPushButton("Open Video…")
+        self.btn_open.clicked.connect(self.pick_video)
+        top.addWidget(self.video_label, 1)
+        top.addWidget(self.btn_open)
+        root.addLayout(top)
+
+        # Filter + parameters
+        params = QHBoxLayout()
+        self.filter_combo = QComboBox()
+        self.filter_combo.addItems(list(FILTERS))
+
+        self.clip_spin = QDoubleSpinBox()
+        self.clip_spin.setRange(0.1, 20.0)
+        self.clip_spin.setSingleStep(0.1)
+        self.clip_spin.setValue(2.5)
+
+        self.tile_spin = QSpinBox()
+        self.tile_spin.setRange(1, 64)
+        self.tile_spin.setValue(8)
+
+        self.gamma_spin = QDoubleSpinBox()
+        self.gamma_spin.setRange(0.10, 5.00)
+        self.gamma_spin.setSingleStep(0.05)
+        self.gamma_spin.setValue(0.60)
+
+        self.sigma_spin = QDoubleSpinBox()
+        self.sigma_spin.setRange(5.0, 300.0)
+        self.sigma_spin.setSingleStep(5.0)
+        self.sigma_spin.setValue(80.0)
+
+        self.scale_combo = QComboBox()
+        for label, s in PREVIEW_SCALES:
+            self.scale_combo.addItem(label, userData=s)
+        self.scale_combo.setCurrentIndex(1)
+
+        params.addWidget(QLabel("Filter:"))
+        params.addWidget(self.filter_combo)
+        params.addWidget(QLabel("CLAHE clip:"))
+        params.addWidget(self.clip_spin)
+        params.addWidget(QLabel("Tiles:"))
+        params.addWidget(self.tile_spin)
+        params.addWidget(QLabel("Gamma:"))
+        params.addWidget(self.gamma_spin)
+        params.addWidget(QLabel("Retinex σ:"))
+        params.addWidget(self.sigma_spin)
+        params.addStretch(1)
+        params.addWidget(self.scale_combo)
+        root.addLayout(params)
+
+        # Original | Enhanced
+        views = QHBoxLayout()
+        self.original_view = self._make_view("Original")
+        self.enhanced_view = self._make_view("Enhanced")
+        views.addWidget(self.original_view, 1)
+        views.addWidget(self.enhanced_view, 1)
+        root.addLayout(views, 1)
+
+        # Scrubber
+        scrub = QHBoxLayout()
+        self.slider = QSlider(Qt.Orientation.Horizontal)
+        self.slider.setRange(0, 0)
+        self.idx_label = QLabel("0 / 0")
+        scrub.addWidget(QLabel("Frame:"))
+        scrub.addWidget(self.slider, 1)
+        scrub.addWidget(self.idx_label)
+        root.addLayout(scrub)
+
+        self.info = QLabel("Open a video to preview.")
+        root.addWidget(self.info)
+
+        for w in (self.clip_spin, self.gamma_spin, self.sigma_spin):
+            w.valueChanged.connect(self.request_render)
+        self.tile_spin.valueChanged.connect(self.request_render)
+        self.filter_combo.currentIndexChanged.connect(self.request_render)
+        self.scale_combo.currentIndexChanged.connect(self.request_render)
+        self.slider.valueChanged.connect(self.request_render)
+
+        self.resize(1100, 620)
+        if video_path:
+            self.load_video(video_path)
+
+    @staticmethod
+    def _make_view(text: str) -> QLabel:
+        view = QLabel(text)
+        view.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        view.setMinimumSize(320, 240)
+        # Ignored: the pixmap follows the label size, never the other way round
+        view.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        view.setStyleSheet("background:#111; color:#ddd; border-radius:8px;")
+        return view
+
+    # ---- Public API ----
+    def load_video(self, path: str):
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            self.info.setText(f"Could not open video: {path}")
+            return
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 0
+        cap.release()
+
+        self._stop_renderer()
+        self.video_path = path
+        self.video_label.setText(f"Video: {path}")
+        self._start_renderer()
+
+        self.slider.blockSignals(True)
+        self.slider.setRange(0, max(0, self.frame_count - 1))
+        self.slider.setValue(0)
+        self.slider.blockSignals(False)
+        self.request_render()
+
+    def specs(self) -> list:
+        return FILTERS[self.filter_combo.currentText()](self)
+
+    def clahe_spec(self) -> dict:
+        t = int(self.tile_spin.value())
+        return {"op": "clahe", "clip_limit": float(self.clip_spin.value()), "tile_grid_size": (t, t)}
+
+    def gamma_spec(self) -> dict:
+        return {"op": "gamma", "gamma": float(self.gamma_spin.value())}
+
+    def retinex_spec(self) -> dict:
+        return {"op": "retinex", "sigma_retinex": float(self.sigma_spin.value())}
+
+    def request_render(self, *_):
+        if self.renderer is None:
+            return
+        idx = int(self.slider.value())
+        self.idx_label.setText(f"{idx + 1} / {self.frame_count}")
+        self._latest_id = self.renderer.submit(idx, self.specs(), float(self.scale_combo.currentData()))
+
+    # ---- Internal handlers ----
+    def pick_video(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select Video", "", "Video Files (*.mp4 *.avi *.mov *.mkv);;All Files (*)"
+        )
+        if path:
+            self.load_video(path)
+
+    def _on_rendered(self, rid: int, original: QImage, enhanced: QImage, ms: float):
+        if rid != self._latest_id:
+            return
+        self._images = (original, enhanced)
+        self._show_images()
+        self.info.setText(f"{self.filter_combo.currentText()} · {self.scale_combo.currentText()} "
+                          f"({original.width()}x{original.height()}) · {ms:.0f} ms")
+
+    def _on_failed(self, rid: int, msg: str):
+        if rid == self._latest_id:
+            self.info.setText(f"Preview failed: {msg}")
+
+    def _show_images(self):
+        for view, img in zip((self.original_view, self.enhanced_view), self._images):
+            if img is None:
+                continue
+            pix = QPixmap.fromImage(img).scaled(view.size(), Qt.AspectRatioMode.KeepAspectRatio,
+                                                Qt.TransformationMode.SmoothTransformation)
+            view.setPixmap(pix)
+
+    def _start_renderer(self):
+        self.renderer = LiveRenderer(self.video_path, self)
+        self.renderer.rendered.connect(self._on_rendered)
+        self.renderer.failed.connect(self._on_failed)
+        self.renderer.start()
+
+    def _stop_renderer(self):
+        if self.renderer is not None:
+            self.renderer.stop()
+            self.renderer = None
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._show_images()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # closeEvent stopped the renderer; reopening the same video must restart it
+        if self.renderer is None and self.video_path:
+            self._start_renderer()
+            self.request_render()
+
+    def closeEvent(self, event):
+        self._stop_renderer()
+        super().closeEvent(event)
@@ -2,12 +2,16 @@ import os
 import glob
 import cv2
 
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QPixmap, QImage, QIcon
+from PyQt6.QtCore import Qt, QSize, QModelIndex, QTimer
+from PyQt6.QtGui import QPixmap, QImage
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListView,
     QSlider, QPushButton, QFileDialog
 )
+from utils.frame_store import FrameStore
+from ui.image_cache import DiskThumbCache
+from ui.thumbnail_model import ThumbnailModel
+from ui.frame_loader import FrameLoader
 
 def cv_bgr_to_qpixmap(bgr):
     rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
@@ -15,16 +19,42 @@ def cv_bgr_to_qpixmap(bgr):
     qimg = QImage(rgb.data, w, h, ch * w, QImage.Format.Format_RGB888)
     return QPixmap.fromImage(qimg)
 
+# Frames decoded ahead of the scrub direction
+PREFETCH_FRAMES = 6
+# Slider moves within this window share one decode (the latest position wins)
+DECODE_COALESCE_MS = 30
+
+def _read_for_thumb(path: str):
+    # Reduced decode: JPEG decodes at 1/4 scale directly, others are downscaled by the codec
+    bgr = cv2.imread(path, cv2.IMREAD_REDUCED_COLOR_4)
+    return bgr if bgr is not None else cv2.imread(path)
+
+def _thumb_key(path: str) -> str:
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|240x136"
+
 class PreviewPage(QWidget):
     """
     Timeline-like frame preview for extracted frames.
-    Expects a folder with frame_000001.png ... etc
+    Expects a folder with frame_000001.png ... etc, or a frame store
+    (utils.frame_store) written by extraction with target="store".
     """
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, frame_cache_mb: int = 256):
         super().__init__(parent)
 
         self.frames = []  # list of filepaths
+        self.store = None  # FrameStore, used instead of self.frames when set
         self.current_index = 0
+        self._step = 1      # last index change, for prefetch direction / stride
+        self._wanted = None  # (idx, (w, h)) the preview is waiting for
+
+        # Decoded, pre-scaled frames; decodes run off the GUI thread
+        self.frame_loader = FrameLoader(max_bytes=frame_cache_mb << 20, parent=self)
+        self.frame_loader.ready.connect(self._on_frame_ready)
+        self._decode_timer = QTimer(self)
+        self._decode_timer.setSingleShot(True)
+        self._decode_timer.setInterval(DECODE_COALESCE_MS)
+        self._decode_timer.timeout.connect(self._request_wanted)
 
         root = QVBoxLayout(self)
 
@@ -55,20 +85,31 @@ class PreviewPage(QWidget):
         scrub.addWidget(self.idx_label)
         root.addLayout(scrub)
 
-        # Thumbnail strip
-        self.thumbs = QListWidget()
-        self.thumbs.setViewMode(QListWidget.ViewMode.IconMode)
-        self.thumbs.setFlow(QListWidget.Flow.LeftToRight)
+        # Thumbnail strip: virtualized, thumbnails decoded on a thread pool as they scroll into view
+        try:
+            disk = DiskThumbCache()
+        except OSError:
+            disk = None
+        self.thumb_model = ThumbnailModel(thumb_size=(240, 136), disk_cache=disk, parent=self)
+        self.thumbs = QListView()
+        self.thumbs.setModel(self.thumb_model)
+        self.thumbs.setViewMode(QListView.ViewMode.IconMode)
+        self.thumbs.setFlow(QListView.Flow.LeftToRight)
         self.thumbs.setWrapping(False)
-        self.thumbs.setResizeMode(QListWidget.ResizeMode.Adjust)
-        self.thumbs.setMovement(QListWidget.Movement.Static)
+        self.thumbs.setResizeMode(QListView.ResizeMode.Adjust)
+        self.thumbs.setMovement(QListView.Movement.Static)
+        self.thumbs.setUniformItemSizes(True)  # no per-row sizeHint => no per-row data() on layout
         self.thumbs.setIconSize(QSize(120, 68))
         self.thumbs.setFixedHeight(110)
-        self.thumbs.itemClicked.connect(self.on_thumb_clicked)
+        self.thumbs.clicked.connect(self.on_thumb_clicked)
+        self.thumbs.horizontalScrollBar().valueChanged.connect(self._request_visible_thumbs)
         root.addWidget(self.thumbs)
 
     # ---- Public API: call this after extraction finishes ----
     def load_frames_dir(self, folder: str):
+        if FrameStore.is_store(folder):
+            self.load_store(folder)
+            return
         self.folder_label.setText(f"Folder: {folder}")
 
         # Get common patterns
@@ -78,29 +119,59 @@ class PreviewPage(QWidget):
             files.extend(glob.glob(os.path.join(folder, p)))
         files.sort()
 
+        self.store = None
         self.frames = files
-        self.thumbs.clear()
+        self._populate()
+
+    def load_store(self, path: str):
+        self.folder_label.setText(f"Store: {path}")
+        self.store = FrameStore(path)
+        self.frames = []
+        self._populate()
 
-        if not self.frames:
+    def frame_count(self) -> int:
+        return len(self.store) if self.store is not None else len(self.frames)
+
+    def _load_frame(self, idx: int):
+        """BGR frame `idx` (a view into the mapped store, or decoded from file); None if unreadable."""
+        if self.store is not None:
+            return self.store[idx]
+        return cv2.imread(self.frames[idx])
+
+    def _populate(self):
+        n = self.frame_count()
+        # Loaders capture the current list/store, so jobs still running for
+        # a previous folder never index into the new one
+        if self.store is not None:
+            store = self.store
+            self.thumb_model.set_source(n, lambda i: store[i])  # mapped frames: no disk cache needed
+            self.frame_loader.set_source(lambda i: store[i])
+        else:
+            files = list(self.frames)
+            self.thumb_model.set_source(n, lambda i: _read_for_thumb(files[i]), lambda i: _thumb_key(files[i]))
+            self.frame_loader.set_source(lambda i: cv2.imread(files[i]))
+        self._wanted = None
+
+        if not n:
             self.preview.setText("No frames found in folder.")
             self.slider.setRange(0, 0)
             self.idx_label.setText("0 / 0")
             return
 
-        # Populate thumbnails (simple and reliable version)
-        # For huge frame counts, we can later “sample” every k frames or async load.
-        for i, fp in enumerate(self.frames):
-            bgr = cv2.imread(fp)
-            if bgr is None:
-                continue
-            thumb = cv2.resize(bgr, (240, 136), interpolation=cv2.INTER_AREA)
-            icon = QIcon(cv_bgr_to_qpixmap(thumb))
-            item = QListWidgetItem(icon, str(i))
-            item.setData(Qt.ItemDataRole.UserRole, i)
-            self.thumbs.addItem(item)
-
-        self.slider.setRange(0, len(self.frames) - 1)
+        self.slider.setRange(0, n - 1)
         self.set_index(0)
+        self._request_visible_thumbs()
+
+    def _request_visible_thumbs(self, *_):
+        n = self.frame_count()
+        if not n:
+            return
+        # Static left-to-right layout: row = scroll offset / item stride
+        r0 = self.thumbs.visualRect(self.thumb_model.index(0))
+        r1 = self.thumbs.visualRect(self.thumb_model.index(1)) if n > 1 else r0
+        stride = max(1, r1.x() - r0.x() if n > 1 else r0.width())
+        lo = self.thumbs.horizontalScrollBar().value() // stride
+        self.thumb_model.request_range(lo, lo + self.thumbs.viewport().width() // stride + 1)
 
     # ---- Internal handlers ----
     def pick_folder(self):
@@ -109,43 +180,84 @@ class PreviewPage(QWidget):
             self.load_frames_dir(folder)
 
     def set_index(self, idx: int):
-        if not self.frames:
+        n = self.frame_count()
+        if not n:
             return
-        idx = max(0, min(idx, len(self.frames) - 1))
+        idx = max(0, min(idx, n - 1))
+        if idx != self.current_index:
+            self._step = idx - self.current_index
         self.current_index = idx
-
-        fp = self.frames[idx]
-        bgr = cv2.imread(fp)
-        if bgr is None:
-            return
-
-        pix = cv_bgr_to_qpixmap(bgr)
-        # Fit preview while preserving aspect
-        scaled = pix.scaled(self.preview.size(), Qt.AspectRatioMode.KeepAspectRatio,
-                           Qt.TransformationMode.SmoothTransformation)
-        self.preview.setPixmap(scaled)
+        self._show_current()
 
         self.slider.blockSignals(True)
         self.slider.setValue(idx)
         self.slider.blockSignals(False)
 
-        self.idx_label.setText(f"{idx+1} / {len(self.frames)}")
+        self.idx_label.setText(f"{idx+1} / {n}")
 
         # keep thumbnails visible
-        item = self.thumbs.item(idx)
-        if item:
-            self.thumbs.setCurrentItem(item)
-            self.thumbs.scrollToItem(item)
+        ix = self.thumb_model.index(idx)
+        self.thumbs.setCurrentIndex(ix)
+        self.thumbs.scrollTo(ix)
+
+    def _preview_box(self) -> tuple[int, int]:
+        return max(1, self.preview.width()), max(1, self.preview.height())
+
+    def _show_current(self):
+        """Show the cached frame for the current size, else a rescaled cached copy, else decode."""
+        idx, box = self.current_index, self._preview_box()
+        self._wanted = (idx, box)
+        pix = self.frame_loader.get(idx, box)
+        sharp = pix is not None
+        if pix is None:
+            src = self.frame_loader.get_any(idx)
+            if src is not None:
+                pix = self.frame_loader.put_scaled(idx, box, src)
+                sharp = pix.width() <= src.width()
+        if pix is not None:
+            self.preview.setPixmap(pix)
+        if sharp:
+            self._prefetch()
+        elif not self._decode_timer.isActive():
+            self._decode_timer.start()
+
+    def _request_wanted(self):
+        if self._wanted is None:
+            return
+        idx, box = self._wanted
+        # Anything still queued is for positions the slider already left
+        self.frame_loader.cancel_queued()
+        self.frame_loader.request(idx, box, priority=1)
+
+    def _prefetch(self):
+        n = self.frame_count()
+        box = self._preview_box()
+        direction = 1 if self._step >= 0 else -1
+        stride = max(1, abs(self._step))
+        for j in range(1, PREFETCH_FRAMES + 1):
+            k = self.current_index + direction * stride * j
+            if not 0 <= k < n:
+                break
+            self.frame_loader.request(k, box)
+
+    def _on_frame_ready(self, idx: int):
+        # Decodes for positions that were scrubbed past only land in the cache
+        if self._wanted is None or idx != self._wanted[0]:
+            return
+        pix = self.frame_loader.get(idx, self._wanted[1])
+        if pix is not None:
+            self.preview.setPixmap(pix)
+            self._prefetch()
 
-    def on_thumb_clicked(self, item: QListWidgetItem):
-        idx = int(item.data(Qt.ItemDataRole.UserRole))
-        self.set_index(idx)
+    def on_thumb_clicked(self, index: QModelIndex):
+        self.set_index(index.row())
 
     def on_slider_changed(self, value: int):
         self.set_index(value)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        # re-scale current preview on resize
-        if self.frames:
-            self.set_index(self.current_index)
+        # re-scale the cached pixmap on resize (no reload from disk)
+        if self.frame_count():
+            self._show_current()
+            self._request_visible_thumbs()
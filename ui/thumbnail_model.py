@@ -0,0 +1,169 @@
+'''
+Description:
+    Virtualized thumbnail strip model: only rows the view paints (plus a
+    prefetch window) are decoded, on a QThreadPool, with thumbnails kept in
+    a memory LRU and a disk cache.
+'''
+
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QColor, QIcon, QImage, QPixmap
+
+from ui.image_cache import LRUCache, DiskThumbCache
+
+
+def bgr_to_qimage(bgr: np.ndarray) -> QImage:
+    """Owned copy (safe to hand across threads)."""
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    h, w, ch = rgb.shape
+    return QImage(rgb.data, w, h, ch * w, QImage.Format.Format_RGB888).copy()
+
+
+class _Relay(QObject):
+    loaded = pyqtSignal(int, int, QImage)  # generation, row, thumbnail (null on failure)
+
+
+class _ThumbJob(QRunnable):
+    def __init__(self, relay, gen, row, load_fn, key_fn, disk, size):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.relay = relay
+        self.gen = gen
+        self.row = row
+        self.load_fn = load_fn
+        self.key_fn = key_fn
+        self.disk = disk
+        self.size = size
+
+    def run(self):
+        qimg = QImage()
+        try:
+            key = self.key_fn(self.row) if (self.key_fn and self.disk) else None
+            thumb = self.disk.get(key) if key else None
+            if thumb is None:
+                bgr = self.load_fn(self.row)
+                if bgr is not None:
+                    thumb = cv2.resize(bgr, self.size, interpolation=cv2.INTER_AREA)
+                    if key:
+                        self.disk.put(key, thumb)
+            if thumb is not None:
+                qimg = bgr_to_qimage(thumb)
+        except Exception:
+            pass
+        try:
+            self.relay.loaded.emit(self.gen, self.row, qimg)
+        except RuntimeError:  # model already destroyed
+            pass
+
+
+class ThumbnailModel(QAbstractListModel):
+    """
+    Rows are frame indices. set_source(count, load_fn, key_fn) swaps in a
+    new frame list without touching any file; thumbnails are requested from
+    data() and request_range(). load_fn(row) -> BGR (or None) runs on the
+    pool; key_fn(row) -> disk cache key, or None to skip the disk cache.
+    """
+    def __init__(
+        self,
+        thumb_size: tuple[int, int] = (240, 136),
+        prefetch: int = 32,
+        mem_bytes: int = 64 << 20,
+        disk_cache: Optional[DiskThumbCache] = None,
+        pool: Optional[QThreadPool] = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.thumb_size = thumb_size
+        self.prefetch = max(0, int(prefetch))
+        self.disk = disk_cache
+        self.pool = pool or QThreadPool.globalInstance()
+
+        tw, th = thumb_size
+        self._icons = LRUCache(mem_bytes, cost=lambda _: tw * th * 4)
+        self._count = 0
+        self._load_fn = None
+        self._key_fn = None
+        self._gen = 0
+        self._pending = {}   # row -> queued/running job
+        self._failed = set()
+
+        ph = QPixmap(tw, th)
+        ph.fill(QColor("#222"))
+        self._placeholder = QIcon(ph)
+
+        self._relay = _Relay(self)
+        self._relay.loaded.connect(self._on_loaded)
+
+    def set_source(self, count: int, load_fn: Callable, key_fn: Optional[Callable] = None) -> None:
+        self.beginResetModel()
+        self._drop_queued(keep=range(0))
+        self._gen += 1
+        self._pending.clear()
+        self._failed.clear()
+        self._icons.clear()
+        self._count = int(count)
+        self._load_fn = load_fn
+        self._key_fn = key_fn
+        self.endResetModel()
+
+    # ---- Qt model API ----
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._count
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(row)
+        if role == Qt.ItemDataRole.UserRole:
+            return row
+        if role == Qt.ItemDataRole.DecorationRole:
+            icon = self._icons.get(row)
+            if icon is None:
+                self._request(row)
+                return self._placeholder
+            return icon
+        return None
+
+    # ---- Loading ----
+    def request_range(self, first: int, last: int) -> None:
+        """Make sure rows first..last (plus the prefetch window) are loaded; drop queued jobs outside it."""
+        if not self._count:
+            return
+        lo = max(0, first - self.prefetch)
+        hi = min(self._count - 1, last + self.prefetch)
+        self._drop_queued(keep=range(lo, hi + 1))
+        # Visible rows first, then outwards
+        for row in range(max(0, first), min(self._count - 1, last) + 1):
+            self._request(row)
+        for d in range(1, self.prefetch + 1):
+            for row in (last + d, first - d):
+                if lo <= row <= hi:
+                    self._request(row)
+
+    def _request(self, row: int) -> None:
+        if row in self._pending or row in self._failed or row in self._icons:
+            return
+        job = _ThumbJob(self._relay, self._gen, row, self._load_fn, self._key_fn, self.disk, self.thumb_size)
+        self._pending[row] = job
+        self.pool.start(job)
+
+    def _drop_queued(self, keep: range) -> None:
+        for row, job in list(self._pending.items()):
+            if row not in keep and self.pool.tryTake(job):
+                del self._pending[row]
+
+    def _on_loaded(self, gen: int, row: int, qimg: QImage) -> None:
+        if gen != self._gen:
+            return
+        self._pending.pop(row, None)
+        if qimg.isNull():
+            self._failed.add(row)
+            return
+        self._icons.put(row, QIcon(QPixmap.fromImage(qimg)))
+        ix = self.index(row)
+        self.dataChanged.emit(ix, ix, [Qt.ItemDataRole.DecorationRole])
@@ -1,5 +1,6 @@
 import os 
 import sys
+import time
 import cv2 
 
 """
@@ -16,20 +17,69 @@ import cv2
 import cv2 
 from typing import Callable, Optional
 from utils.video_io import validPath, openVideo, getVideoMeta, framePath
+from utils.profiling import FrameProfiler, NULL_PROFILER
+from utils.image_writer import AsyncImageWriter, encode_params
+from utils.frame_store import FrameStoreWriter
+from utils.progress import ProgressReporter
 
 
 class ExtractConfig:
-    def __init__(self, mode ,str = "fps", value: int = 1, ext: str = "png"):
+    """
+    sparse: skip unsaved frames with cap.grab() (no BGR conversion / copy) and,
+    for gaps of at least seek_min_step frames, seek with CAP_PROP_POS_FRAMES
+    when that has measured cheaper than grabbing. Seeking is checked once
+    against a sequential decode and switched off if the container is inaccurate.
+    sparse=False decodes every frame with cap.read() (the old behaviour).
+
+    ext: png, jpg/jpeg, webp or npy (raw array). Frames are encoded on
+    write_workers threads (0 = auto) with at most write_queue in flight.
+
+    target="store" writes a memory-mapped FrameStore (utils.frame_store) at
+    output_dir instead of one file per frame; ext and the encode options are
+    ignored and chunks hold store_chunk_mb of frames.
+    """
+    def __init__(
+        self,
+        mode: str = "fps",
+        value: int = 1,
+        ext: str = "png",
+        sparse: bool = True,
+        seek_min_step: int = 16,
+        png_compression: Optional[int] = None,
+        jpeg_quality: int = 95,
+        webp_quality: int = 95,
+        write_workers: int = 0,
+        write_queue: int = 32,
+        target: str = "images",
+        store_chunk_mb: int = 256,
+    ):
+        if target not in ("images", "store"):
+            raise ValueError(f"target must be 'images' or 'store', got {target!r}")
         self.mode = mode 
         self.value = max(1, int(value))
-        self.ext = ext
+        self.ext = ext.lower().lstrip(".")
+        self.sparse = sparse
+        self.seek_min_step = max(2, int(seek_min_step))
+        self.png_compression = png_compression
+        self.jpeg_quality = jpeg_quality
+        self.webp_quality = webp_quality
+        self.write_workers = write_workers
+        self.write_queue = write_queue
+        self.target = target
+        self.store_chunk_mb = max(1, int(store_chunk_mb))
+
+    def encode_params(self) -> list:
+        return encode_params(self.ext, self.png_compression, self.jpeg_quality, self.webp_quality)
 
 class FrameExtractor:
     def extract(
         self, video_path: str, output_dir: str, cfg: ExtractConfig,
         progress_cb: Optional[Callable[[int, str], None]] = None,
-        cancel_cb: Optional[Callable[[],bool]] = None 
+        cancel_cb: Optional[Callable[[],bool]] = None,
+        profiler: Optional[FrameProfiler] = None
     ) -> int:
+        prof = profiler or NULL_PROFILER
+        params = cfg.encode_params() if cfg.target == "images" else None
         validPath(output_dir)
         cap = openVideo(video_path)
         
@@ -38,52 +88,153 @@ class FrameExtractor:
         total_frames = meta["frame_count"] 
         
         step = self._compute_step (cfg.mode, cfg.value, src_fps)
-        if progress_cb:
-            if cfg.mode == "fps":
-                progress_cb(0, f"Mode: {cfg.value} fps (save every {step} frames)")
-            else:
-                progress_cb(0, f"Mode: every {step} frames")
+        report = ProgressReporter(progress_cb, total_frames)
+        if cfg.mode == "fps":
+            report.message(0, f"Mode: {cfg.value} fps (save every {step} frames)")
+        else:
+            report.message(0, f"Mode: every {step} frames")
                 
+        seeker = _Seeker(video_path, cfg.seek_min_step) if cfg.sparse and step > 1 else None
+        if cfg.target == "store":
+            writer = FrameStoreWriter(output_dir, cfg.store_chunk_mb << 20, fps=src_fps, source=video_path)
+            put = lambda idx, frame: writer.append(frame, idx, cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+        else:
+            writer = AsyncImageWriter(cfg.write_workers, cfg.write_queue, params, profiler=prof)
+            put = lambda idx, frame: writer.submit(framePath(out_dir=output_dir, frame_idx=idx, ext=cfg.ext), frame)
+        try:
+            saved, cancelled = self._extract_loop(
+                cap, put, seeker, step, total_frames, report, cancel_cb, prof
+            )
+            # Queued frames are still written on cancel, so `saved` matches what is on disk
+            writer.close()
+        except BaseException:
+            writer.close(cancel=True)
+            raise
+        finally:
+            cap.release()
+
+        if cancelled:
+            report.message(0, "Cancelled")
+            return saved
+        prof.finish()
+        report.finish(f"Done. Saved {saved} frames.")
+        return saved
+
+    @staticmethod
+    def _extract_loop(cap, put, seeker, step, total_frames, report, cancel_cb, prof):
         saved = 0 
-        frame_idx = 0 
+        frame_idx = 0   # index of the next frame the decoder will return
+        target = 0      # index of the next frame to save
         
         while True: 
             if cancel_cb and cancel_cb():
-                if progress_cb:
-                    progress_cb(0,"Cancelled")
-                    cap.release()
-                    return saved
-                
-            ret, frame = cap.read()
+                return saved, True
+
+            # The frame count is only an estimate: the loop ends when the decoder
+            # runs out, and past the estimate gaps are grabbed rather than sought
+            t0 = prof.now()
+            if seeker is None:
+                # Dense: decode everything, keep every step-th frame
+                ret, frame = cap.read()
+                while ret and frame_idx < target:
+                    frame_idx += 1
+                    ret, frame = cap.read()
+            elif (total_frames <= 0 or target < total_frames) and seeker.should_seek(target - frame_idx) \
+                    and seeker.seek(cap, target):
+                ret, frame = cap.read()
+            else:
+                ret = seeker.skip(cap, target - frame_idx)
+                if ret:
+                    ret, frame = cap.read()
+                    if ret:
+                        seeker.validate(frame, target)
             if not ret:
                 break 
+            prof.record("read", t0)
+            frame_idx = target + 1
             
+            # Images are encoded off-thread and raise here if an earlier write failed
+            t0 = prof.now()
+            put(target, frame)
+            prof.record("write_wait", t0)
+            saved += 1
+            target += step
             
-            #Index frame saving 
-            if frame_idx % step == 0:
-                out_path = framePath(out_dir=output_dir,frame_idx = frame_idx, ext = cfg.ext)
-                ok = cv2.imwrite(out_path, frame)
-                
-                if not ok:
-                    cap.release()
-                    raise RuntimeError(f"Failed to write frame: {out_path}")
-                saved += 1
+            report.update(min(frame_idx, total_frames) if total_frames > 0 else frame_idx)
                 
-            frame_idx += 1
-            
-            if progress_cb and total_frames > 0:
-                pct = int((frame_idx / total_frames) * 100)
-                progress_cb(min(100, max(0, pct )) , f"Processing frame{frame_idx}/{total_frames}...")
-                
-                
-        cap.release()
-        if progress_cb:
-            progress_cb(100, "Done.")
-        return saved
+        return saved, False
 
     @staticmethod
     def _compute_step(mode: str, value: int, src_fps: float) -> int:
         if mode == "fps":
             target_fps = max(1, int(value))
             return max(1, int(round(src_fps / target_fps)))
-        return max(1, int(value))
\ No newline at end of file
+        return max(1, int(value))
+
+class _Seeker:
+    """
+    Chooses between grabbing through a gap and seeking over it.
+
+    With the FFmpeg backend grab() still decodes but skips the BGR conversion,
+    while set(CAP_PROP_POS_FRAMES) jumps to the keyframe before the target and
+    decodes forward from there; which one wins depends on the GOP length, so
+    both are timed and the cheaper one is used per gap. The first seek
+    candidate is decoded sequentially and compared against a seek on a second
+    capture; if the frames differ (or set/read fails) seeking stays off.
+    """
+    def __init__(self, video_path: str, min_step: int):
+        self.video_path = video_path
+        self.min_step = min_step
+        self.enabled = True
+        self.validated = False
+        self.grab_s = None      # mean seconds per grab()
+        self.seek_s = None      # mean seconds per set(CAP_PROP_POS_FRAMES)
+        self._pending = False   # the next read() is the validation reference
+
+    def should_seek(self, gap: int) -> bool:
+        if not self.enabled or gap < self.min_step:
+            return False
+        if not self.validated:
+            self._pending = True
+            return False
+        return self.grab_s is None or self.seek_s < gap * self.grab_s
+
+    def skip(self, cap, gap: int) -> bool:
+        if gap <= 0:
+            return True
+        t0 = time.perf_counter()
+        for _ in range(gap):
+            if not cap.grab():
+                return False
+        per = (time.perf_counter() - t0) / gap
+        self.grab_s = per if self.grab_s is None else 0.8 * self.grab_s + 0.2 * per
+        return True
+
+    def seek(self, cap, target: int) -> bool:
+        t0 = time.perf_counter()
+        if not cap.set(cv2.CAP_PROP_POS_FRAMES, target):
+            self.enabled = False
+            return False
+        self._update_seek(time.perf_counter() - t0)
+        return True
+
+    def validate(self, frame, target: int) -> None:
+        if not self._pending:
+            return
+        self._pending = False
+        self.validated = True
+        probe = cv2.VideoCapture(self.video_path)
+        try:
+            t0 = time.perf_counter()
+            ok = probe.isOpened() and probe.set(cv2.CAP_PROP_POS_FRAMES, target)
+            elapsed = time.perf_counter() - t0
+            ret, seeked = probe.read() if ok else (False, None)
+        finally:
+            probe.release()
+        if not ret or seeked.shape != frame.shape or cv2.norm(seeked, frame, cv2.NORM_INF) != 0:
+            self.enabled = False
+            return
+        self._update_seek(elapsed)
+
+    def _update_seek(self, seconds: float) -> None:
+        self.seek_s = seconds if self.seek_s is None else 0.8 * self.seek_s + 0.2 * seconds
@@ -0,0 +1,197 @@
+'''
+Description:
+    Memory-mapped frame store: extracted frames in a few large .npy chunks
+    plus an index, instead of one image file per frame.
+
+    <store>/
+        chunk_00000.npy     (n, h, w, c) uint8, opened with mmap
+        chunk_00001.npy
+        index.npy           structured: frame (source frame number), t (seconds)
+        meta.json           written last; a store without it is incomplete
+
+    Readers get frames as read-only views into the mapped chunks (no copy,
+    no decode):
+
+        store = FrameStore("out.frames")
+        frame = store[10]            # (h, w, c) view
+        store.frame_numbers, store.timestamps
+'''
+
+import glob
+import json
+import os
+import numpy as np
+from typing import Optional
+
+STORE_VERSION = 1
+META_NAME = "meta.json"
+INDEX_NAME = "index.npy"
+INDEX_DTYPE = np.dtype([("frame", "<i8"), ("t", "<f8")])
+
+
+def _chunk_path(path: str, k: int) -> str:
+    return os.path.join(path, f"chunk_{k:05d}.npy")
+
+
+class FrameStoreWriter:
+    """
+    Appends frames to a store at `path` (a directory, created if needed;
+    an existing store there is replaced). Chunks hold chunk_bytes worth of
+    frames; the frame shape is taken from the first append(). The last chunk
+    is trimmed to its used length on close().
+    """
+    def __init__(self, path: str, chunk_bytes: int = 256 << 20, fps: float = 0.0, source: str = ""):
+        self.path = path
+        self.chunk_bytes = max(1, int(chunk_bytes))
+        self.fps = float(fps)
+        self.source = source
+        self.count = 0
+        self.shape = None
+        self.dtype = None
+        self.chunk_frames = 0
+        self._chunk = None
+        self._chunk_idx = -1
+        self._used = 0
+        self._index = []
+        self._closed = False
+
+        os.makedirs(path, exist_ok=True)
+        for old in glob.glob(os.path.join(path, "chunk_*.npy")) + [
+            os.path.join(path, META_NAME), os.path.join(path, INDEX_NAME)
+        ]:
+            if os.path.isfile(old):
+                os.remove(old)
+
+    def append(self, frame: np.ndarray, frame_no: int, timestamp: float) -> None:
+        if self.shape is None:
+            self.shape = frame.shape
+            self.dtype = frame.dtype
+            self.chunk_frames = max(1, self.chunk_bytes // frame.nbytes)
+        elif frame.shape != self.shape or frame.dtype != self.dtype:
+            raise ValueError(f"Frame {frame_no} is {frame.shape} {frame.dtype}, store holds {self.shape} {self.dtype}")
+
+        if self._chunk is None or self._used == self.chunk_frames:
+            self._next_chunk()
+        self._chunk[self._used] = frame
+        self._used += 1
+        self._index.append((int(frame_no), float(timestamp)))
+        self.count += 1
+
+    def close(self, cancel: bool = False) -> None:
+        """
+        Flush and write the index and meta; a store closed early this way holds
+        the frames appended so far. cancel=True (an error or abort) writes
+        neither, so readers reject the store as incomplete.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._finish_chunk()
+        if cancel:
+            return
+        np.save(os.path.join(self.path, INDEX_NAME), np.array(self._index, dtype=INDEX_DTYPE))
+        meta = {
+            "version": STORE_VERSION,
+            "count": self.count,
+            "shape": list(self.shape) if self.shape is not None else None,
+            "dtype": self.dtype.str if self.dtype is not None else None,
+            "chunk_frames": self.chunk_frames,
+            "chunks": self._chunk_idx + 1,
+            "fps": self.fps,
+            "source": self.source,
+        }
+        tmp = os.path.join(self.path, META_NAME + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, META_NAME))
+
+    def _next_chunk(self) -> None:
+        self._finish_chunk()
+        self._chunk_idx += 1
+        self._used = 0
+        self._chunk = np.lib.format.open_memmap(
+            _chunk_path(self.path, self._chunk_idx), mode="w+",
+            dtype=self.dtype, shape=(self.chunk_frames,) + tuple(self.shape),
+        )
+
+    def _finish_chunk(self) -> None:
+        if self._chunk is None:
+            return
+        chunk, used = self._chunk, self._used
+        self._chunk = None
+        chunk.flush()
+        if used == chunk.shape[0]:
+            del chunk
+            return
+        # Trim the last chunk so its header shape is the real frame count
+        path = _chunk_path(self.path, self._chunk_idx)
+        tmp = path + ".tmp"
+        trimmed = np.lib.format.open_memmap(tmp, mode="w+", dtype=chunk.dtype, shape=(used,) + chunk.shape[1:])
+        trimmed[:] = chunk[:used]
+        trimmed.flush()
+        del trimmed, chunk
+        os.replace(tmp, path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(cancel=exc_type is not None)
+        return False
+
+
+class FrameStore:
+    """Read side of a store; store[i] is a read-only (h, w, c) view into the mapped chunk."""
+    def __init__(self, path: str):
+        meta_path = os.path.join(path, META_NAME)
+        if not os.path.isfile(meta_path):
+            raise RuntimeError(f"Not a frame store (or extraction did not finish): {path}")
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise RuntimeError(f"Unsupported frame store version: {meta.get('version')}")
+
+        self.path = path
+        self.meta = meta
+        self.count = int(meta["count"])
+        self.shape = tuple(meta["shape"]) if meta["shape"] else None
+        self.fps = float(meta.get("fps") or 0.0)
+        self.chunk_frames = int(meta["chunk_frames"])
+        self._chunks = [None] * int(meta["chunks"])
+
+        index = np.load(os.path.join(path, INDEX_NAME))
+        self.frame_numbers = index["frame"]
+        self.timestamps = index["t"]
+
+    @staticmethod
+    def is_store(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, META_NAME)) and os.path.isfile(os.path.join(path, INDEX_NAME))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(f"frame {i} out of range (0..{self.count - 1})")
+        k, j = divmod(i, self.chunk_frames)
+        return self.chunk(k)[j]
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def chunk(self, k: int) -> np.ndarray:
+        """The k-th chunk as one (n, h, w, c) memmap, e.g. for batched loaders."""
+        arr = self._chunks[k]
+        if arr is None:
+            arr = self._chunks[k] = np.load(_chunk_path(self.path, k), mmap_mode="r")
+        return arr
+
+    def find(self, frame_no: int) -> Optional[int]:
+        """Store index of source frame `frame_no`, or None if it was not extracted."""
+        i = int(np.searchsorted(self.frame_numbers, frame_no))
+        if i < self.count and self.frame_numbers[i] == frame_no:
+            return i
+        return None
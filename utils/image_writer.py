@@ -0,0 +1,118 @@
+'''
+Description:
+    Background image writer for frame extraction: encoding and saving run on
+    a thread pool (cv2.imwrite releases the GIL) while the caller keeps decoding.
+'''
+
+import os
+import threading
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from utils.profiling import FrameProfiler, NULL_PROFILER
+
+IMAGE_FORMATS = ("png", "jpg", "jpeg", "webp", "npy")
+
+
+def encode_params(
+    ext: str,
+    png_compression: Optional[int] = None,
+    jpeg_quality: int = 95,
+    webp_quality: int = 95,
+) -> list:
+    """
+    cv2.imwrite params for `ext`. png_compression=None keeps OpenCV's default
+    (level 1 with the RLE strategy, much faster than an explicit level);
+    webp_quality > 100 means lossless. Other extensions (bmp, tiff, ...) get
+    no params and are left to cv2.imwrite.
+    """
+    ext = ext.lower()
+    if ext == "png":
+        if png_compression is None:
+            return []
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(np.clip(png_compression, 0, 9))]
+    if ext in ("jpg", "jpeg"):
+        return [cv2.IMWRITE_JPEG_QUALITY, int(np.clip(jpeg_quality, 0, 100))]
+    if ext == "webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, int(np.clip(webp_quality, 1, 101))]
+    return []
+
+
+def write_image(path: str, frame: np.ndarray, params: Optional[list] = None) -> bool:
+    if path.endswith(".npy"):
+        # Raw array; write to the exact path (np.save would append .npy to other names)
+        with open(path, "wb") as f:
+            np.save(f, frame)
+        return True
+    return cv2.imwrite(path, frame, params or [])
+
+
+class AsyncImageWriter:
+    """
+    Writes frames on `workers` threads with at most `queue_size` frames in
+    flight; submit() blocks when the queue is full.
+
+    The first failed write is re-raised from the next submit() or from close().
+    Frames are not copied: don't modify an array after submitting it.
+
+        with AsyncImageWriter(params=encode_params("png", 1)) as w:
+            w.submit(path, frame)
+    """
+    def __init__(
+        self,
+        workers: int = 0,
+        queue_size: int = 32,
+        params: Optional[list] = None,
+        profiler: Optional[FrameProfiler] = None,
+    ):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.params = params or []
+        self._prof = profiler or NULL_PROFILER
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="imwrite")
+        self._slots = threading.BoundedSemaphore(max(1, int(queue_size)))
+        self._lock = threading.Lock()
+        self._error = None
+        self.written = 0
+
+    def submit(self, path: str, frame: np.ndarray) -> None:
+        self._raise_if_failed()
+        self._slots.acquire()
+        fut = self._pool.submit(self._write, path, frame)
+        fut.add_done_callback(self._done)
+
+    def close(self, cancel: bool = False) -> None:
+        """Wait for queued writes (or drop the ones not started, if cancel) and raise the first error."""
+        self._pool.shutdown(wait=True, cancel_futures=cancel)
+        if not cancel:
+            self._raise_if_failed()
+
+    def _write(self, path: str, frame: np.ndarray) -> None:
+        t0 = self._prof.now()
+        ok = write_image(path, frame, self.params)
+        self._prof.record("write", t0)
+        if not ok:
+            raise RuntimeError(f"Failed to write frame: {path}")
+
+    def _done(self, fut) -> None:
+        with self._lock:
+            if not fut.cancelled():
+                err = fut.exception()
+                if err is not None and self._error is None:
+                    self._error = err
+                elif err is None:
+                    self.written += 1
+        self._slots.release()
+
+    def _raise_if_failed(self) -> None:
+        with self._lock:
+            err = self._error
+        if err is not None:
+            raise err
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(cancel=exc_type is not None)
+        return False
@@ -0,0 +1,185 @@
+'''
+Description:
+    Process-pool backend for VideoProcessor. Worker processes run the frame
+    transform outside the GIL. Frames travel through a ring of slots in one
+    multiprocessing.shared_memory block: the decoder reads straight into a
+    free slot and the worker writes its result back into the same slot, so
+    only (slot, frame index) pairs are pickled per frame. A slot is handed
+    back once its frame has been written, which bounds memory and stalls the
+    decoder when the writer falls behind.
+'''
+
+import multiprocessing as mp
+import pickle
+import queue
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def check_process_transform(frame_transform) -> None:
+    """Raise ValueError unless frame_transform can run in worker processes."""
+    if getattr(frame_transform, "stateful", False):
+        raise ValueError("The process backend needs a stateless frame transform (frames run out of order)")
+    try:
+        pickle.dumps(frame_transform)
+    except Exception as e:
+        raise ValueError(f"The process backend needs a picklable frame transform: {e}") from e
+
+
+class SharedFrameRing:
+    """`slots` uint8 frames of one shape in a single SharedMemory block."""
+
+    def __init__(self, slots: int, shape: tuple, name: str = None):
+        self.slots = int(slots)
+        self.shape = tuple(shape)
+        size = self.slots * int(np.prod(self.shape))
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # Spawned workers share the creator's resource tracker, so
+            # attaching doesn't hand them ownership; the creator unlinks
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.frames = np.ndarray((self.slots,) + self.shape, np.uint8, buffer=self._shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def close(self) -> None:
+        self.frames = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass    # a caller still holds a view; the mapping goes with it
+        if self._owner:
+            self._shm.unlink()
+
+
+def _worker_main(ring_name, slots, shape, transform, tasks, results):
+    ring = SharedFrameRing(slots, shape, name=ring_name)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            idx, slot = task
+            frame = ring.frames[slot]
+            t0 = time.perf_counter()
+            try:
+                out = transform(frame)
+            except Exception:
+                results.put((idx, slot, None, traceback.format_exc(), 0.0))
+                continue
+            dt = time.perf_counter() - t0
+            if out.shape == frame.shape and out.dtype == np.uint8:
+                if out is not frame:
+                    np.copyto(frame, out)
+                out = None
+            # Results of another shape / dtype are pickled back instead
+            results.put((idx, slot, out, None, dt))
+    finally:
+        ring.close()
+
+
+class ProcessFramePool:
+    """
+    Worker processes around a SharedFrameRing.
+
+        slot = pool.acquire()             # free slot, None on timeout
+        ret, _ = cap.read(pool.frames[slot])
+        pool.submit(idx, slot)
+        idx, slot, out, dt = pool.get()   # out is pool.frames[slot] or a pickled array
+        pool.release(slot)
+
+    Workers are spawned (not forked) so a process holding threads or a GUI
+    doesn't leak into them; the transform is pickled once per worker.
+    """
+
+    def __init__(self, transform, shape: tuple, workers: int, slots: int):
+        check_process_transform(transform)
+        self.workers = max(1, int(workers))
+        self.ring = SharedFrameRing(max(int(slots), self.workers + 1), shape)
+        self.frames = self.ring.frames
+        self._free = queue.Queue()
+        for slot in range(self.ring.slots):
+            self._free.put(slot)
+
+        ctx = mp.get_context("spawn")
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._procs = [
+            ctx.Process(
+                target=_worker_main,
+                args=(self.ring.name, self.ring.slots, self.ring.shape, transform, self._tasks, self._results),
+                name=f"vp-worker-{i}",
+                daemon=True,
+            )
+            for i in range(self.workers)
+        ]
+        try:
+            for p in self._procs:
+                p.start()
+        except Exception:
+            self.close()
+            raise
+
+    def acquire(self, timeout: float = 0.1):
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, slot: int) -> None:
+        self._free.put(slot)
+
+    def submit(self, idx: int, slot: int) -> None:
+        self._tasks.put((idx, slot))
+
+    def get(self, timeout: float = 0.1):
+        """(idx, slot, out, seconds in transform), or None on timeout. Raises RuntimeError if a worker failed."""
+        try:
+            idx, slot, out, error, dt = self._results.get(timeout=timeout)
+        except queue.Empty:
+            self._check_alive()
+            return None
+        if error is not None:
+            raise RuntimeError(f"Frame transform failed in worker process:\n{error}")
+        return idx, slot, (self.frames[slot] if out is None else out), dt
+
+    def _check_alive(self) -> None:
+        for p in self._procs:
+            if p.exitcode not in (None, 0):
+                raise RuntimeError(f"Worker process {p.name} exited with code {p.exitcode}")
+
+    def close(self) -> None:
+        # Drop frames still queued so workers reach the stop markers quickly
+        try:
+            while True:
+                self._tasks.get_nowait()
+        except (queue.Empty, OSError, ValueError):
+            pass
+        for p in self._procs:
+            if p.is_alive():
+                self._tasks.put(None)
+        # Keep draining results: a worker can't exit while its queue feeder
+        # is blocked on a full pipe
+        deadline = time.monotonic() + 5.0
+        while any(p.is_alive() for p in self._procs) and time.monotonic() < deadline:
+            try:
+                self._results.get(timeout=0.05)
+            except (queue.Empty, OSError, ValueError):
+                pass
+        for p in self._procs:
+            if p.is_alive():
+                p.terminate()
+            if p.pid is not None:
+                p.join()
+        for q in (self._tasks, self._results):
+            q.close()
+            q.cancel_join_thread()
+        self.frames = None
+        self.ring.close()
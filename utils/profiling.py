@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+from typing import Optional, Callable
+
+
+class FrameProfiler:
+    """
+    Per-stage timings for the processing loops, kept in a fixed-size ring
+    buffer per stage (the last `capacity` samples).
+
+        t0 = prof.now()
+        ret, frame = cap.read()
+        prof.record("read", t0)
+
+    finish() is called by the loop at the end of a job: it hands summary() to
+    on_summary and writes a Chrome trace (chrome://tracing, Perfetto) if
+    trace_path is set. Loops default to NULL_PROFILER, whose methods do nothing.
+    """
+    enabled = True
+
+    def __init__(
+        self,
+        capacity: int = 4096,
+        on_summary: Optional[Callable[[dict], None]] = None,
+        trace_path: Optional[str] = None,
+    ):
+        self.capacity = max(1, int(capacity))
+        self.on_summary = on_summary
+        self.trace_path = trace_path
+        self._rings = {}
+        self._lock = threading.Lock()
+        self._t_origin = time.perf_counter()
+
+    @staticmethod
+    def now() -> float:
+        return time.perf_counter()
+
+    def record(self, stage: str, t0: float, t1: Optional[float] = None) -> None:
+        if t1 is None:
+            t1 = time.perf_counter()
+        tid = threading.get_ident()
+        with self._lock:
+            ring = self._rings.get(stage)
+            if ring is None:
+                ring = self._rings[stage] = _Ring(self.capacity)
+            ring.push(t0, t1 - t0, tid)
+
+    def summary(self) -> dict:
+        """stage -> {count, mean_ms, p50_ms, p90_ms, p99_ms, max_ms} over the ring."""
+        out = {}
+        with self._lock:
+            items = [(stage, ring.durations()) for stage, ring in self._rings.items()]
+        for stage, dur in items:
+            ms = dur * 1000.0
+            p50, p90, p99 = np.percentile(ms, (50, 90, 99))
+            out[stage] = {
+                "count": int(ms.size),
+                "mean_ms": float(ms.mean()),
+                "p50_ms": float(p50),
+                "p90_ms": float(p90),
+                "p99_ms": float(p99),
+                "max_ms": float(ms.max()),
+            }
+        return out
+
+    def write_chrome_trace(self, path: str) -> None:
+        events = []
+        pid = os.getpid()
+        with self._lock:
+            for stage, ring in self._rings.items():
+                for start, dur, tid in ring.samples():
+                    events.append({
+                        "name": stage,
+                        "ph": "X",
+                        "ts": (start - self._t_origin) * 1e6,
+                        "dur": dur * 1e6,
+                        "pid": pid,
+                        "tid": tid,
+                    })
+        events.sort(key=lambda e: e["ts"])
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def finish(self) -> None:
+        if self.on_summary:
+            self.on_summary(self.summary())
+        if self.trace_path:
+            self.write_chrome_trace(self.trace_path)
+
+
+class _Ring:
+    def __init__(self, capacity: int):
+        self.start = np.zeros(capacity, np.float64)
+        self.dur = np.zeros(capacity, np.float64)
+        self.tid = np.zeros(capacity, np.int64)
+        self.n = 0
+
+    def push(self, start: float, dur: float, tid: int) -> None:
+        i = self.n % self.start.size
+        self.start[i] = start
+        self.dur[i] = dur
+        self.tid[i] = tid & 0x7FFFFFFFFFFFFFFF
+        self.n += 1
+
+    def _valid(self) -> int:
+        return min(self.n, self.start.size)
+
+    def durations(self) -> np.ndarray:
+        return self.dur[:self._valid()].copy()
+
+    def samples(self):
+        k = self._valid()
+        return zip(self.start[:k].tolist(), self.dur[:k].tolist(), self.tid[:k].tolist())
+
+
+class _NullProfiler:
+    """Stand-in when profiling is off: every call is a no-op."""
+    enabled = False
+
+    @staticmethod
+    def now() -> float:
+        return 0.0
+
+    def record(self, stage: str, t0: float, t1: Optional[float] = None) -> None:
+        pass
+
+    def summary(self) -> dict:
+        return {}
+
+    def finish(self) -> None:
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
@@ -0,0 +1,104 @@
+'''
+Description:
+    Throttled progress reporting shared by the processing loops. Loops count
+    frames; the reporter turns the count into at most one
+    progress_cb(percent, msg) call per `interval` with throughput and ETA, so
+    a worker thread emitting Qt signals from progress_cb doesn't flood the GUI
+    event loop at hundreds of fps.
+'''
+
+import time
+from typing import Optional, Callable
+
+
+def format_eta(seconds: float) -> str:
+    seconds = int(max(0.0, seconds) + 0.5)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+class ProgressReporter:
+    """
+        report = ProgressReporter(progress_cb, total)
+        for i, frame in enumerate(frames):
+            ...
+            report.update(i + 1)          # coalesced to <= 1 / interval calls
+        report.finish()                   # progress_cb(100, "Done.")
+
+    update() is cheap when throttled (one clock read) and a no-op without a
+    progress_cb. fps is smoothed between reports; with total <= 0 (unknown
+    frame count) the percentage stays 0 and only the count and fps are shown.
+    message() and finish() are never throttled.
+    """
+
+    def __init__(
+        self,
+        progress_cb: Optional[Callable[[int, str], None]],
+        total: int = 0,
+        interval: float = 0.1,
+        unit: str = "Frame",
+        smoothing: float = 0.3,
+    ):
+        self.progress_cb = progress_cb
+        self.total = max(0, int(total))
+        self.interval = float(interval)
+        self.unit = unit
+        self.smoothing = float(smoothing)
+        self.done = 0
+        self.fps = 0.0
+        self._t_start = time.monotonic()
+        self._t_last = self._t_start
+        self._done_last = 0
+        self._reported = False
+
+    @property
+    def percent(self) -> int:
+        if self.total <= 0:
+            return 0
+        return min(100, max(0, int(self.done * 100 / self.total)))
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds left at the current rate, or None if unknown."""
+        if self.total <= 0 or self.fps <= 0:
+            return None
+        return max(0, self.total - self.done) / self.fps
+
+    def update(self, done: int, force: bool = False) -> bool:
+        """Record `done` items; report if `interval` has passed (or force). Returns True if reported."""
+        self.done = done
+        if self.progress_cb is None:
+            return False
+        now = time.monotonic()
+        dt = now - self._t_last
+        if dt < self.interval and self._reported and not force:
+            return False
+
+        if dt > 0 and done > self._done_last:
+            rate = (done - self._done_last) / dt
+            self.fps = rate if self.fps <= 0 else self.fps + self.smoothing * (rate - self.fps)
+        self._t_last = now
+        self._done_last = done
+        self._reported = True
+        self.progress_cb(self.percent, self.status())
+        return True
+
+    def status(self) -> str:
+        msg = f"{self.unit} {self.done}/{self.total}" if self.total > 0 else f"{self.unit} {self.done}"
+        if self.fps > 0:
+            msg += f" · {self.fps:.1f} fps"
+        eta = self.eta
+        if eta is not None:
+            msg += f" · ETA {format_eta(eta)}"
+        return msg
+
+    def message(self, percent: int, msg: str) -> None:
+        if self.progress_cb is not None:
+            self.progress_cb(percent, msg)
+
+    def finish(self, msg: str = "Done.") -> None:
+        elapsed = time.monotonic() - self._t_start
+        if self.done > 0 and elapsed > 0:
+            msg = f"{msg} ({self.done} {self.unit.lower()}s in {format_eta(elapsed)}, {self.done / elapsed:.1f} fps)"
+        self.message(100, msg)
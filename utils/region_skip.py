@@ -0,0 +1,157 @@
+'''
+Description:
+    Static-region skip for fixed-camera footage. Each frame is compared with
+    the input the cached output was rendered from, block by block; while the
+    model's per-frame global parameters (LUTs, exposure) stay put, only the
+    blocks that changed are rendered again and the rest of the previous
+    output is reused.
+'''
+
+import math
+import cv2
+import numpy as np
+
+# Default per-pixel change (levels) that marks a block dirty. The skip is
+# lossy: changes below it are not rendered until they accumulate past it,
+# and the model's tone curve / sharpening amplify what was missed. On a 60
+# frame 1080p fixed-camera clip, against rendering every frame in full:
+#   Retinex  4: 99.9% of values within 5 levels, mean 0.52, worst 14 (71% skipped)
+#            1: 99.9% within 2, mean 0.08, worst 9 (38% skipped)
+#   CLAHE    4: 99.9% within 1, mean 0.005, worst 10 (76% skipped)
+PIXEL_THRESHOLD = 4
+
+
+def skip_ratio(stats: dict) -> float:
+    total = stats.get("pixels", 0)
+    return 1.0 - stats["rendered_pixels"] / total if total else 0.0
+
+
+def skip_summary(stats: dict) -> str:
+    """One line from StaticRegionSkip.stats (or several summed)."""
+    return (f"static skip {skip_ratio(stats) * 100:.1f}% of pixels, "
+            f"{stats['full_frames']}/{stats['frames']} frames rendered in full")
+
+
+class StaticRegionSkip:
+    """
+    Frame transform around a model that can render part of a frame:
+
+        model.frame_params(frame) -> (planes, params)
+            planes: tuple of uint8 HxW / HxWxC arrays the output is rendered from
+            params: tuple of per-frame global arrays (e.g. the LUTs in use)
+        model.render_region(planes, params, y0, y1, x0, x1) -> output[y0:y1, x0:x1]
+        model.region_halo: pixels of context one output pixel depends on
+
+    A block is dirty if more than `min_changed` of its pixels moved by more
+    than `pixel_threshold` levels in any plane since it was last rendered
+    (drifts below that accumulate until they cross it; see PIXEL_THRESHOLD
+    for the resulting error). Dirty blocks are
+    grown by the halo and rendered as a few rectangles. The whole frame is
+    rendered when a param moved by more than `param_tol` or more than
+    `max_dirty` of the blocks are dirty.
+
+    stateful: frames must arrive in order (see VideoProcessor).
+    stats: {"frames", "full_frames", "pixels", "rendered_pixels"}; see skip_ratio().
+    """
+    stateful = True
+
+    def __init__(
+        self,
+        model,
+        block: int = 32,
+        pixel_threshold: int = PIXEL_THRESHOLD,
+        min_changed: float = 0.0,
+        param_tol: int = 1,
+        max_dirty: float = 0.6,
+    ):
+        self.model = model
+        self.block = max(8, int(block))
+        self.pixel_threshold = int(pixel_threshold)
+        self.min_changed = float(min_changed)
+        self.param_tol = int(param_tol)
+        self.max_dirty = float(max_dirty)
+        self.reset()
+
+    def reset(self):
+        self.stats = {"frames": 0, "full_frames": 0, "pixels": 0, "rendered_pixels": 0}
+        self._ref_planes = None
+        self._ref_params = None
+        self._out = None
+
+    def skip_ratio(self) -> float:
+        """Fraction of output pixels reused instead of rendered."""
+        return skip_ratio(self.stats)
+
+    def summary(self) -> str:
+        return skip_summary(self.stats)
+
+    def _params_close(self, params) -> bool:
+        for a, b in zip(params, self._ref_params):
+            if a.shape != b.shape:
+                return False
+            if np.abs(a.astype(np.int32) - b).max(initial=0) > self.param_tol:
+                return False
+        return True
+
+    def _dirty_blocks(self, planes) -> np.ndarray:
+        """uint8 (blocks_y, blocks_x) mask of blocks that changed."""
+        h, w = planes[0].shape[:2]
+        b = self.block
+        ys = np.minimum(np.arange(-(-h // b) + 1) * b, h)
+        xs = np.minimum(np.arange(-(-w // b) + 1) * b, w)
+        area = np.diff(ys)[:, None] * np.diff(xs)[None, :]
+        frac = np.zeros(area.shape, np.float64)
+        for cur, ref in zip(planes, self._ref_planes):
+            moved = cv2.threshold(cv2.absdiff(cur, ref), self.pixel_threshold, 1, cv2.THRESH_BINARY)[1]
+            # Block sums of moved pixels from the integral image (exact for edge blocks too)
+            g = cv2.integral(moved)[ys][:, xs]
+            counts = g[1:, 1:] - g[:-1, 1:] - g[1:, :-1] + g[:-1, :-1]
+            if counts.ndim == 3:
+                counts = counts.max(axis=2)
+            np.maximum(frac, counts / area, out=frac)
+        dirty = (frac > self.min_changed).astype(np.uint8)
+        grow = math.ceil(getattr(self.model, "region_halo", 0) / b)
+        if grow and dirty.any():
+            dirty = cv2.dilate(dirty, np.ones((2 * grow + 1, 2 * grow + 1), np.uint8))
+        return dirty
+
+    def _render(self, planes, params, y0, y1, x0, x1):
+        h, w = planes[0].shape[:2]
+        halo = int(getattr(self.model, "region_halo", 0))
+        ry0, ry1 = max(0, y0 - halo), min(h, y1 + halo)
+        rx0, rx1 = max(0, x0 - halo), min(w, x1 + halo)
+        region = self.model.render_region(planes, params, ry0, ry1, rx0, rx1)
+        self._out[y0:y1, x0:x1] = region[y0 - ry0:y1 - ry0, x0 - rx0:x1 - rx0]
+        for cur, ref in zip(planes, self._ref_planes):
+            ref[y0:y1, x0:x1] = cur[y0:y1, x0:x1]
+        self.stats["rendered_pixels"] += int(y1 - y0) * int(x1 - x0)
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        planes, params = self.model.frame_params(frame)
+        h, w = planes[0].shape[:2]
+        self.stats["frames"] += 1
+        self.stats["pixels"] += h * w
+
+        full = (self._out is None or self._ref_planes[0].shape != planes[0].shape
+                or not self._params_close(params))
+        if not full:
+            dirty = self._dirty_blocks(planes)
+            full = dirty.mean() > self.max_dirty
+
+        if full:
+            self._out = self.model.render_region(planes, params, 0, h, 0, w).copy()
+            self._ref_planes = [p.copy() for p in planes]
+            self._ref_params = [p.copy() for p in params]
+            self.stats["full_frames"] += 1
+            self.stats["rendered_pixels"] += h * w
+        elif dirty.any():
+            b = self.block
+            n, _, rects, _ = cv2.connectedComponentsWithStats(dirty, connectivity=8)
+            # Python ints: the rects are int32 and the stats must not wrap
+            for bx, by, bw, bh, _ in rects[1:n].tolist():
+                self._render(planes, params, by * b, min(h, (by + bh) * b), bx * b, min(w, (bx + bw) * b))
+
+        # The writer may still hold the previous result, so hand out a copy
+        return self._out.copy()
+
+    apply = __call__
@@ -0,0 +1,22 @@
+'''
+Description:
+    Host resource probes shared by the CLI and the GUI job queue. Standard
+    library only, so importing it keeps startup light.
+'''
+
+import os
+
+
+def available_memory_mb():
+    """Memory available to new processes in MB, or None if it can't be read."""
+    try:
+        with open("/proc/meminfo", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) >> 10
+    except OSError:
+        pass
+    try:
+        return (os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")) >> 20
+    except (AttributeError, ValueError, OSError):
+        return None
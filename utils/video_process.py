@@ -1,18 +1,64 @@
 import os
+import queue
+import threading
 import cv2
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Callable
 from utils.video_io import openVideo, getVideoMeta, validPath
+from utils.profiling import FrameProfiler, NULL_PROFILER
+from utils.progress import ProgressReporter
+from utils.process_pool import ProcessFramePool, check_process_transform
+
+BACKENDS = ("thread", "process")
+
 
 class VideoProcessConfig:
-    def __init__(self, out_fps: Optional[float] = None, codec: str = "mp4v"):
+    """
+    pipeline: overlap decode / transform / encode on separate threads.
+    workers: transform threads in pipeline mode (0 => os.cpu_count()).
+    queue_size: max frames buffered between stages (bounds memory).
+    reuse_buffers: decode every frame into the same buffer (sequential mode
+        only). The transform must not keep a reference to its input frame.
+    backend: "thread" or "process". "process" runs the transform in `workers`
+        worker processes (0 => os.cpu_count()) with frames in shared memory
+        (see utils.process_pool), for transforms that hold the GIL. It
+        implies pipeline; the transform must be picklable and not stateful.
+    """
+    def __init__(
+        self,
+        out_fps: Optional[float] = None,
+        codec: str = "mp4v",
+        pipeline: bool = False,
+        workers: int = 0,
+        queue_size: int = 8,
+        reuse_buffers: bool = False,
+        backend: str = "thread",
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
         self.out_fps = out_fps
         self.codec = codec
+        self.pipeline = pipeline
+        self.workers = workers
+        self.queue_size = queue_size
+        self.reuse_buffers = reuse_buffers
+        self.backend = backend
+
+_END = object()  # reader -> writer sentinel
 
 class VideoProcessor:
     """
     Apply a frame_transform(frame)->frame to every frame and write to output video.
-    progress_cb(percent:int, msg:str)
+    progress_cb(percent:int, msg:str), at most ~10 times a second (ProgressReporter)
     cancel_cb()->bool
+
+    With cfg.pipeline the transform runs on a thread pool and may be called
+    concurrently, so it must not depend on the previous frame. Frames are still
+    written in input order, and both callbacks stay on the calling thread.
+    Transforms that carry state between frames set `stateful = True`; they get
+    a single transform thread (decode and encode still overlap).
+    profiler: optional FrameProfiler; records read / transform / write (and
+    "wait", the writer blocked on the pipeline) per frame.
     """
     def process(
         self,
@@ -22,7 +68,9 @@ class VideoProcessor:
         cfg: VideoProcessConfig,
         progress_cb: Optional[Callable[[int, str], None]] = None,
         cancel_cb: Optional[Callable[[], bool]] = None,
+        profiler: Optional[FrameProfiler] = None,
     ) -> None:
+        prof = profiler or NULL_PROFILER
         cap = openVideo(in_path)
         meta = getVideoMeta(cap)
 
@@ -33,41 +81,237 @@ class VideoProcessor:
 
         validPath(os.path.dirname(out_path) or ".")
 
+        if cfg.backend == "process":
+            # Fail before the output file is created
+            check_process_transform(frame_transform)
+
         fourcc = cv2.VideoWriter_fourcc(*cfg.codec)
         writer = cv2.VideoWriter(out_path, fourcc, fps_out, (w, h))
         if not writer.isOpened():
             cap.release()
             raise RuntimeError("Could not open VideoWriter. Try codec='XVID' or output .avi")
 
-        if progress_cb:
-            progress_cb(0, f"Processing… {w}x{h} @ {fps_out:.2f} fps")
+        report = ProgressReporter(progress_cb, total)
+        report.message(0, f"Processing… {w}x{h} @ {fps_out:.2f} fps")
 
+        try:
+            if cfg.backend == "process":
+                done = self._run_processes(cap, writer, frame_transform, cfg, (w, h), report, cancel_cb, prof)
+            elif cfg.pipeline:
+                done = self._run_pipelined(cap, writer, frame_transform, cfg, (w, h), report, cancel_cb, prof)
+            else:
+                done = self._run_sequential(cap, writer, frame_transform, cfg, (w, h), report, cancel_cb, prof)
+        finally:
+            cap.release()
+            writer.release()
+
+        prof.finish()
+
+        if done:
+            report.finish()
+
+    def _run_sequential(self, cap, writer, frame_transform, cfg, size, report, cancel_cb, prof) -> bool:
+        """True if the input was processed to the end, False if cancelled."""
         idx = 0
+        frame = None
         while True:
             if cancel_cb and cancel_cb():
-                if progress_cb:
-                    progress_cb(0, "Cancelled.")
-                break
+                report.message(0, "Cancelled.")
+                return False
 
-            ret, frame = cap.read()
+            t0 = prof.now()
+            ret, frame = cap.read(frame if cfg.reuse_buffers else None)
             if not ret:
                 break
+            prof.record("read", t0)
 
+            t0 = prof.now()
             out_frame = frame_transform(frame)
+            prof.record("transform", t0)
 
-            # Safety: ensure correct size for writer
-            if out_frame.shape[1] != w or out_frame.shape[0] != h:
-                out_frame = cv2.resize(out_frame, (w, h), interpolation=cv2.INTER_LINEAR)
-
-            writer.write(out_frame)
+            t0 = prof.now()
+            self._write(writer, out_frame, size)
+            prof.record("write", t0)
             idx += 1
+            report.update(idx)
+        return True
+
+    def _run_pipelined(self, cap, writer, frame_transform, cfg, size, report, cancel_cb, prof) -> bool:
+        """
+        reader thread -> transform pool -> writer (calling thread).
+        The reader queues futures in decode order, so popping them FIFO keeps the
+        output ordered; the bounded queue gives backpressure on the decoder.
+        """
+        workers = cfg.workers if cfg.workers > 0 else (os.cpu_count() or 1)
+        if getattr(frame_transform, "stateful", False):
+            workers = 1
+        pending = queue.Queue(maxsize=max(1, cfg.queue_size))
+        stop = threading.Event()
+        reader_error = []
+
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vp-transform")
+
+        def timed_transform(frame):
+            t0 = prof.now()
+            out = frame_transform(frame)
+            prof.record("transform", t0)
+            return out
+
+        if prof.enabled:
+            transform = timed_transform
+        else:
+            transform = frame_transform
+
+        def put(item) -> bool:
+            # Timed put so a cancelled writer never leaves the reader blocked.
+            while not stop.is_set():
+                try:
+                    pending.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def reader():
+            try:
+                while not stop.is_set():
+                    t0 = prof.now()
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    prof.record("read", t0)
+                    if not put(pool.submit(transform, frame)):
+                        break
+            except Exception as e:
+                reader_error.append(e)
+            finally:
+                put(_END)
+
+        reader_thread = threading.Thread(target=reader, name="vp-reader", daemon=True)
+        reader_thread.start()
+
+        idx = 0
+        cancelled = False
+        try:
+            while True:
+                if cancel_cb and cancel_cb():
+                    report.message(0, "Cancelled.")
+                    cancelled = True
+                    break
+
+                t0 = prof.now()
+                item = pending.get()
+                if item is _END:
+                    break
+                out_frame = item.result()
+                prof.record("wait", t0)
+
+                t0 = prof.now()
+                self._write(writer, out_frame, size)
+                prof.record("write", t0)
+                idx += 1
+                report.update(idx)
+        finally:
+            stop.set()
+            reader_thread.join()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        if reader_error:
+            raise reader_error[0]
+        return not cancelled
+
+    def _run_processes(self, cap, writer, frame_transform, cfg, size, report, cancel_cb, prof) -> bool:
+        """
+        reader thread -> worker processes -> writer (calling thread), frames in
+        a ProcessFramePool's shared-memory slots. Results can arrive out of
+        order; they are held (slot and all) until their turn, and the reader
+        waits for a free slot, so at most max(queue_size, 2 * workers) frames
+        are in flight.
+        """
+        w, h = size
+        workers = cfg.workers if cfg.workers > 0 else (os.cpu_count() or 1)
+        pool = ProcessFramePool(frame_transform, (h, w, 3), workers, max(cfg.queue_size, 2 * workers))
+        stop = threading.Event()
+        reader_done = threading.Event()
+        reader_error = []
+        read_count = [0]
+
+        def reader():
+            try:
+                idx = 0
+                while not stop.is_set():
+                    slot = pool.acquire()
+                    if slot is None:
+                        continue
+                    t0 = prof.now()
+                    dst = pool.frames[slot]
+                    ret, frame = cap.read(dst)
+                    if not ret:
+                        pool.release(slot)
+                        break
+                    if frame is not dst:
+                        if frame.shape != dst.shape:
+                            raise RuntimeError(f"Decoded frame {frame.shape} does not match the stream size {dst.shape}")
+                        dst[:] = frame
+                    prof.record("read", t0)
+                    pool.submit(idx, slot)
+                    idx += 1
+                    read_count[0] = idx
+            except Exception as e:
+                reader_error.append(e)
+            finally:
+                reader_done.set()
+
+        reader_thread = threading.Thread(target=reader, name="vp-reader", daemon=True)
+
+        idx = 0
+        ready = {}  # frame index -> (slot, result) waiting for its turn
+        cancelled = False
+        try:
+            reader_thread.start()
+            t_wait = prof.now()
+            while True:
+                if cancel_cb and cancel_cb():
+                    report.message(0, "Cancelled.")
+                    cancelled = True
+                    break
+
+                if idx in ready:
+                    slot, out_frame = ready.pop(idx)
+                    prof.record("wait", t_wait)
+                    t0 = prof.now()
+                    self._write(writer, out_frame, size)
+                    prof.record("write", t0)
+                    out_frame = None
+                    pool.release(slot)
+                    idx += 1
+                    report.update(idx)
+                    t_wait = prof.now()
+                    continue
 
-            if progress_cb and total > 0:
-                pct = int((idx / total) * 100)
-                progress_cb(min(100, max(0, pct)), f"Frame {idx}/{total}")
+                if reader_error or (reader_done.is_set() and idx >= read_count[0]):
+                    break
+                item = pool.get()
+                if item is not None:
+                    i, slot, out, dt = item
+                    if prof.enabled:
+                        t1 = prof.now()
+                        prof.record("transform", t1 - dt, t1)
+                    ready[i] = (slot, out)
+        finally:
+            stop.set()
+            reader_thread.join()
+            ready.clear()
+            pool.close()
 
-        cap.release()
-        writer.release()
+        if reader_error:
+            raise reader_error[0]
+        return not cancelled
 
-        if progress_cb:
-            progress_cb(100, "Done.")
+    @staticmethod
+    def _write(writer, out_frame, size) -> None:
+        w, h = size
+        # Safety: ensure correct size for writer
+        if out_frame.shape[1] != w or out_frame.shape[0] != h:
+            out_frame = cv2.resize(out_frame, (w, h), interpolation=cv2.INTER_LINEAR)
+        writer.write(out_frame)
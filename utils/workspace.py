@@ -0,0 +1,49 @@
+import threading
+import numpy as np
+
+
+class FrameWorkspace:
+    """
+    Named scratch buffers for one job, allocated on first use and reused for
+    every later frame of the same size. Buffers are per thread, so a single
+    workspace can back a transform running on VideoProcessor's pipeline pool.
+    """
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, name: str, shape: tuple, dtype=np.uint8) -> np.ndarray:
+        bufs = self._local.__dict__.setdefault("bufs", {})
+        buf = bufs.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype)
+            bufs[name] = buf
+        return buf
+
+    # Pickled (e.g. for a worker process) without buffers; they are reallocated on use
+    def __getstate__(self):
+        return {}
+
+    def __setstate__(self, state):
+        self._local = threading.local()
+
+
+def scratch(ws, name: str, shape: tuple, dtype=np.uint8):
+    """ws.get(...) or None (=> let OpenCV / numpy allocate) when ws is None."""
+    if ws is None:
+        return None
+    return ws.get(name, shape, dtype)
+
+
+def to_float32(src: np.ndarray, out=None) -> np.ndarray:
+    if out is None:
+        return src.astype(np.float32)
+    np.copyto(out, src, casting="unsafe")
+    return out
+
+
+def to_uint8(src: np.ndarray, out=None) -> np.ndarray:
+    """Same truncating cast as astype(np.uint8)."""
+    if out is None:
+        return src.astype(np.uint8)
+    np.copyto(out, src, casting="unsafe")
+    return out
@@ -0,0 +1,5 @@
+'''
+Description:
+    Headless entry point: python -m video_enhancer <command> ...
+    (see video_enhancer/cli.py). Never imports PyQt6.
+'''
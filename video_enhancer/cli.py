@@ -0,0 +1,527 @@
+'''
+Description:
+    Headless batch runner for every enhancement mode (no PyQt6 import).
+
+        python -m video_enhancer clahe "data/*.mp4" -o output --clip-limit 2.5 --workers 4
+        python -m video_enhancer retinex --manifest jobs.txt --illum-mode pyramid --mem-budget 3000
+        python -m video_enhancer extract data/a.mp4 --mode fps --value 1 --target store
+
+    Inputs are paths / glob patterns and/or --manifest: a text file with one
+    input per line (optionally "input<TAB>output"; # starts a comment) or a
+    .json list of paths or {"input": ..., "output": ...} objects.
+
+    Jobs run in --workers processes. --mem-budget MB lowers --workers to what
+    the available memory can hold, and a job whose worker's resident memory
+    (RSS, polled; Linux only) goes over it fails. Address space isn't limited,
+    so thread stacks and allocator arenas that are reserved but unused don't
+    count.
+
+    Outputs are written under a ".part" name and renamed once complete;
+    outputs that already exist are skipped unless --overwrite, so re-running
+    the same command resumes an interrupted batch.
+'''
+
+import argparse
+import glob
+import inspect
+import json
+import os
+import shutil
+import sys
+import time
+import typing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.system import available_memory_mb
+
+COMMANDS = ("extract", "histeq", "clahe", "gamma", "retinex")
+
+# enhance_video params not exposed as flags, and flags renamed to avoid
+# clashing with the batch options
+_RETINEX_SKIP = {"in_path", "out_path", "codec", "progress_cb", "cancel_cb", "profiler"}
+_RETINEX_RENAME = {"workers": "render_workers"}
+
+
+# ---- Job runners (executed in the worker process; imports stay lazy) ----
+
+def _video_cfg(p: dict):
+    from utils.video_process import VideoProcessConfig
+    return VideoProcessConfig(
+        codec=p["codec"], pipeline=p["pipeline"], workers=p["threads"], reuse_buffers=p["reuse_buffers"],
+        backend=p["backend"],
+    )
+
+
+def _run_extract(in_path: str, out_path: str, p: dict) -> str:
+    from utils.frame_extraction import FrameExtractor, ExtractConfig
+    saved = FrameExtractor().extract(in_path, out_path, ExtractConfig(**p))
+    return f"{saved} frames"
+
+
+def _skip_static(model, p: dict):
+    """StaticRegionSkip around `model` if --skip-static was given."""
+    if not p["skip_static"]:
+        return None
+    from utils.region_skip import StaticRegionSkip
+    return StaticRegionSkip(model, block=p["skip_block"], pixel_threshold=p["skip_threshold"])
+
+
+def _run_histeq(in_path: str, out_path: str, p: dict) -> str:
+    from models.hist_equa import HistogramEqualizer
+    from utils.video_process import VideoProcessor
+    eq = HistogramEqualizer(
+        reuse_buffers=p["reuse_buffers"], temporal=p["temporal"],
+        hist_alpha=p["hist_alpha"], drift_threshold=p["drift_threshold"],
+    )
+    transform = _skip_static(eq, p) or eq
+    VideoProcessor().process(in_path, out_path, transform, _video_cfg(p))
+    return transform.summary() if p["skip_static"] else ""
+
+
+def _run_clahe(in_path: str, out_path: str, p: dict) -> str:
+    from models.clahe import CLAHEVideoProcessor
+    from utils.video_process import VideoProcessor
+    clahe = CLAHEVideoProcessor(
+        clip_limit=p["clip_limit"], tile_grid_size=p["tile_grid_size"], reuse_buffers=p["reuse_buffers"],
+        temporal=p["temporal"] or p["skip_static"], lut_alpha=p["lut_alpha"], drift_threshold=p["drift_threshold"],
+    )
+    transform = _skip_static(clahe, p) or clahe
+    VideoProcessor().process(in_path, out_path, transform, _video_cfg(p))
+    return transform.summary() if p["skip_static"] else ""
+
+
+def _run_gamma(in_path: str, out_path: str, p: dict) -> str:
+    from models.power_transformation import PowerLawVideoProcessor
+    PowerLawVideoProcessor(
+        gamma=p["gamma"],
+        codec=p["codec"],
+        channel_gammas=p["channel_gammas"],
+        luminance_only=p["luminance_only"],
+        color_space=p["color_space"],
+        pipeline=p["pipeline"],
+        workers=p["threads"],
+        backend=p["backend"],
+    ).process(in_path, out_path)
+    return ""
+
+
+def _run_retinex(in_path: str, out_path: str, p: dict) -> str:
+    from models.retinex_temporal import enhance_video
+    kw = dict(p)
+    for name, flag in _RETINEX_RENAME.items():
+        kw[name] = kw.pop(flag)
+    stats = enhance_video(in_path, out_path, **kw)
+    if stats:
+        from utils.region_skip import skip_summary
+        return skip_summary(stats)
+    return ""
+
+
+RUNNERS = {
+    "extract": _run_extract,
+    "histeq": _run_histeq,
+    "clahe": _run_clahe,
+    "gamma": _run_gamma,
+    "retinex": _run_retinex,
+}
+
+
+def part_path(out_path: str, is_dir: bool) -> str:
+    """Where a job writes before the final rename; keeps the extension so the container is unchanged."""
+    if is_dir:
+        return out_path.rstrip("/\\") + ".part"
+    root, ext = os.path.splitext(out_path)
+    return f"{root}.part{ext}"
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def run_job(job: dict) -> tuple[float, str]:
+    """Run one job into its .part path and rename it into place. Returns (seconds, note)."""
+    out_path = job["output"]
+    is_dir = job["command"] == "extract"
+    tmp = part_path(out_path, is_dir)
+    _remove(tmp)  # leftover from an interrupted run
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+
+    global _job_running, _over_budget
+    t0 = time.perf_counter()
+    _over_budget = None
+    _job_running = True
+    try:
+        note = RUNNERS[job["command"]](job["input"], tmp, job["params"])
+    except MemoryError:
+        _remove(tmp)
+        raise RuntimeError("out of memory (raise --mem-budget or lower --workers)")
+    except KeyboardInterrupt:
+        _remove(tmp)
+        if _over_budget is None:
+            raise
+        rss, limit = _over_budget
+        raise RuntimeError(f"over the memory budget: {rss} MB resident > {limit} MB "
+                           "(raise --mem-budget or lower --workers)")
+    except BaseException:
+        _remove(tmp)
+        raise
+    finally:
+        _job_running = False
+    if not os.path.exists(tmp):
+        raise RuntimeError(f"no output written for {job['input']}")
+    _remove(out_path)  # only present with --overwrite
+    os.replace(tmp, out_path)
+    return time.perf_counter() - t0, note
+
+
+# Worker-side --mem-budget state (see _watch_rss)
+RSS_POLL_S = 0.2
+_job_running = False
+_over_budget = None     # (rss MB, budget MB) once the watchdog tripped
+
+
+def current_rss_mb():
+    """Resident memory of this process in MB, or None where /proc isn't available."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return (pages * os.sysconf("SC_PAGE_SIZE")) >> 20
+
+
+def _watch_rss(limit_mb: int) -> None:
+    """Interrupt the running job (KeyboardInterrupt in run_job) when RSS exceeds the budget."""
+    import _thread
+    global _over_budget
+    while True:
+        rss = current_rss_mb()
+        if rss is None:
+            return
+        if rss > limit_mb and _job_running and _over_budget is None:
+            _over_budget = (rss, limit_mb)
+            _thread.interrupt_main()
+        time.sleep(RSS_POLL_S)
+
+
+def _init_worker(mem_mb: int, cv_threads: int) -> None:
+    if mem_mb > 0 and current_rss_mb() is not None:
+        # Only RSS is checked: an address-space limit (RLIMIT_AS) would also
+        # count the stacks and malloc arenas every transform thread reserves.
+        # Without /proc the --workers cap is all that applies.
+        import threading
+        threading.Thread(target=_watch_rss, args=(mem_mb,), name="rss-watch", daemon=True).start()
+    if cv_threads > 0:
+        import cv2
+        cv2.setNumThreads(cv_threads)
+
+
+# ---- Planning ----
+
+def cap_workers(workers: int, mem_mb: int, n_jobs: int) -> int:
+    workers = max(1, min(int(workers), max(1, n_jobs)))
+    if mem_mb > 0:
+        avail = available_memory_mb()
+        if avail:
+            workers = max(1, min(workers, avail // mem_mb))
+    return workers
+
+
+def read_manifest(path: str) -> list:
+    """[(input, output or None), ...]"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            items = json.load(f)
+            out = []
+            for item in items:
+                if isinstance(item, str):
+                    out.append((item, None))
+                else:
+                    out.append((item["input"], item.get("output")))
+            return out
+        out = []
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split("\t")
+            out.append((parts[0].strip(), parts[1].strip() if len(parts) > 1 and parts[1].strip() else None))
+        return out
+
+
+def collect_inputs(patterns: list, manifest=None) -> list:
+    items = []
+    for pat in patterns:
+        if glob.has_magic(pat):
+            matches = sorted(glob.glob(pat, recursive=True))
+            if not matches:
+                raise ValueError(f"No files match {pat!r}")
+            items.extend((m, None) for m in matches)
+        else:
+            items.append((pat, None))
+    if manifest:
+        items.extend(read_manifest(manifest))
+    return items
+
+
+def default_output(command: str, in_path: str, out_dir: str, suffix: str, ext: str) -> str:
+    stem = os.path.splitext(os.path.basename(in_path))[0]
+    if command == "extract":
+        return os.path.join(out_dir, f"{stem}_{suffix}")
+    return os.path.join(out_dir, f"{stem}_{suffix}.{ext.lstrip('.')}")
+
+
+def plan_jobs(args) -> list:
+    items = collect_inputs(args.inputs, args.manifest)
+    if not items:
+        raise ValueError("No inputs (give paths, globs or --manifest)")
+    params = PARAMS[args.command](args)
+    suffix = args.suffix or args.command
+    ext = getattr(args, "ext", "mp4") if args.command != "extract" else ""
+    jobs, seen = [], {}
+    for in_path, out_path in items:
+        if not os.path.isfile(in_path):
+            raise ValueError(f"Input not found: {in_path}")
+        out_path = out_path or default_output(args.command, in_path, args.out_dir, suffix, ext)
+        key = os.path.abspath(out_path)
+        if key in seen:
+            raise ValueError(f"{in_path} and {seen[key]} would both write {out_path}")
+        seen[key] = in_path
+        jobs.append({"command": args.command, "input": in_path, "output": out_path, "params": params})
+    return jobs
+
+
+# ---- Execution ----
+
+def run_jobs(jobs: list, workers: int = 1, mem_mb: int = 0, overwrite: bool = False, log=print) -> int:
+    """Runs the jobs; returns the number that failed."""
+    todo = []
+    for job in jobs:
+        if not overwrite and os.path.exists(job["output"]):
+            log(f"skip  {job['input']} -> {job['output']} (exists)")
+        else:
+            todo.append(job)
+    if not todo:
+        return 0
+
+    workers = cap_workers(workers, mem_mb, len(todo))
+    cv_threads = max(1, (os.cpu_count() or 1) // workers) if workers > 1 else 0
+    failed = 0
+    total = len(todo)
+
+    def report(i, job, result=None, error=None):
+        nonlocal failed
+        head = f"[{i}/{total}]"
+        if error is not None:
+            failed += 1
+            print(f"{head} FAIL {job['input']}: {error}", file=sys.stderr)
+        else:
+            secs, note = result
+            log(f"{head} done  {job['input']} -> {job['output']} ({secs:.1f} s{', ' + note if note else ''})")
+
+    if workers == 1 and mem_mb <= 0:
+        for i, job in enumerate(todo, 1):
+            try:
+                report(i, job, result=run_job(job))
+            except Exception as e:
+                report(i, job, error=e)
+        return failed
+
+    log(f"Running {total} job(s) on {workers} worker(s)")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(mem_mb, cv_threads)) as pool:
+        futures = {pool.submit(run_job, job): job for job in todo}
+        try:
+            for i, fut in enumerate(as_completed(futures), 1):
+                try:
+                    report(i, futures[fut], result=fut.result())
+                except Exception as e:
+                    report(i, futures[fut], error=e)
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    return failed
+
+
+# ---- Arguments ----
+
+def _size(text: str) -> tuple[int, int]:
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h or w)
+
+
+def _floats3(text: str) -> tuple[float, float, float]:
+    vals = tuple(float(v) for v in text.split(","))
+    if len(vals) != 3:
+        raise argparse.ArgumentTypeError("expected three comma-separated values (b,g,r)")
+    return vals
+
+
+def _add_signature_args(parser, fn, skip: set, rename: dict, choices: dict) -> list:
+    """One flag per keyword parameter of fn, typed from its default / annotation. Returns the dest names."""
+    dests = []
+    for name, p in inspect.signature(fn).parameters.items():
+        if name in skip or p.default is inspect.Parameter.empty:
+            continue
+        dest = rename.get(name, name)
+        flag = "--" + dest.replace("_", "-")
+        default = p.default
+        if isinstance(default, bool):
+            parser.add_argument(flag, dest=dest, action=argparse.BooleanOptionalAction, default=default)
+        else:
+            typ = type(default)
+            if default is None:
+                args = [a for a in typing.get_args(p.annotation) if a is not type(None)]
+                typ = args[0] if args else str
+            parser.add_argument(flag, dest=dest, type=typ, default=default, choices=choices.get(name),
+                                help=f"(default: {default})")
+        dests.append(dest)
+    return dests
+
+
+def build_parser(argv: typing.Optional[list] = None) -> argparse.ArgumentParser:
+    """
+    The retinex flags are generated from enhance_video's signature, which
+    imports models.retinex_temporal (cv2, numpy); that only happens when argv
+    (default: sys.argv[1:]) selects the retinex command, so --help and the
+    other commands start without it.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    ap = argparse.ArgumentParser(prog="python -m video_enhancer", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    batch = argparse.ArgumentParser(add_help=False)
+    g = batch.add_argument_group("batch")
+    g.add_argument("inputs", nargs="*", help="video paths or glob patterns")
+    g.add_argument("--manifest", help="text (input[<TAB>output] per line) or .json list of inputs")
+    g.add_argument("-o", "--out-dir", default="output")
+    g.add_argument("--suffix", help="output name suffix (default: the command name)")
+    g.add_argument("--workers", type=int, default=1, help="jobs processed concurrently (processes)")
+    g.add_argument("--mem-budget", type=int, default=0, metavar="MB",
+                   help="per-job resident memory (RSS) limit, polled on Linux; also caps --workers "
+                        "by available memory")
+    g.add_argument("--overwrite", action="store_true", help="redo outputs that already exist")
+    g.add_argument("-q", "--quiet", action="store_true")
+
+    video = argparse.ArgumentParser(add_help=False)
+    g = video.add_argument_group("output video")
+    g.add_argument("--codec", default="mp4v", help="fourcc (default: mp4v)")
+    g.add_argument("--ext", default="mp4", help="output container extension (default: mp4)")
+
+    frames = argparse.ArgumentParser(add_help=False)
+    g = frames.add_argument_group("frame loop")
+    g.add_argument("--pipeline", action=argparse.BooleanOptionalAction, default=True,
+                   help="overlap decode / transform / encode (default: on)")
+    g.add_argument("--threads", type=int, default=0, help="transform threads in pipeline mode (0 = auto)")
+    g.add_argument("--reuse-buffers", action=argparse.BooleanOptionalAction, default=False)
+    g.add_argument("--backend", choices=("thread", "process"), default="thread",
+                   help="run the transform on threads or in worker processes with shared-memory frames "
+                        "(--threads sets the process count; not with --temporal / --skip-static)")
+
+    static = argparse.ArgumentParser(add_help=False)
+    g = static.add_argument_group("static regions")
+    g.add_argument("--skip-static", action=argparse.BooleanOptionalAction, default=False,
+                   help="fixed camera: re-render only blocks that changed (one transform thread)")
+    g.add_argument("--skip-block", type=int, default=32, help="block size in pixels (default: 32)")
+    # Same default as utils.region_skip.PIXEL_THRESHOLD (not imported: it pulls in cv2)
+    g.add_argument("--skip-threshold", type=int, default=4,
+                   help="per-pixel change in levels that marks a block dirty; lower drifts less from a "
+                        "full render (default: 4)")
+
+    p = sub.add_parser("extract", parents=[batch], help="extract frames to images or a frame store")
+    p.add_argument("--mode", choices=("fps", "every_n"), default="fps")
+    p.add_argument("--value", type=int, default=1, help="fps, or N for every_n")
+    p.add_argument("--ext", dest="image_ext", default="png", help="png, jpg, webp, npy, ...")
+    p.add_argument("--sparse", action=argparse.BooleanOptionalAction, default=True)
+    p.add_argument("--seek-min-step", type=int, default=16)
+    p.add_argument("--png-compression", type=int, default=None)
+    p.add_argument("--jpeg-quality", type=int, default=95)
+    p.add_argument("--webp-quality", type=int, default=95)
+    p.add_argument("--write-workers", type=int, default=0)
+    p.add_argument("--write-queue", type=int, default=32)
+    p.add_argument("--target", choices=("images", "store"), default="images")
+    p.add_argument("--store-chunk-mb", type=int, default=256)
+
+    p = sub.add_parser("histeq", parents=[batch, video, frames, static], help="histogram equalization (Y channel)")
+    p.add_argument("--temporal", action="store_true",
+                   help="equalize with a smoothed histogram across frames (no flicker, one transform thread)")
+    p.add_argument("--hist-alpha", type=float, default=0.1, help="temporal: EMA weight of a new frame's histogram")
+    p.add_argument("--drift-threshold", type=float, default=0.01,
+                   help="temporal: CDF change that triggers a LUT rebuild")
+
+    p = sub.add_parser("clahe", parents=[batch, video, frames, static], help="CLAHE on the L channel")
+    p.add_argument("--clip-limit", type=float, default=2.0)
+    p.add_argument("--tile-grid-size", type=_size, default=(8, 8), metavar="WxH")
+    p.add_argument("--temporal", action="store_true",
+                   help="keep per-tile mappings across frames (stable output, one transform thread; "
+                        "implied by --skip-static)")
+    p.add_argument("--lut-alpha", type=float, default=0.25, help="temporal: EMA weight of a new tile mapping")
+    p.add_argument("--drift-threshold", type=float, default=0.02,
+                   help="temporal: CDF change that triggers a tile rebuild")
+
+    p = sub.add_parser("gamma", parents=[batch, video, frames], help="power-law (gamma) transform")
+    p.add_argument("--gamma", type=float, default=1.0)
+    p.add_argument("--channel-gammas", type=_floats3, default=None, metavar="B,G,R")
+    p.add_argument("--luminance-only", action="store_true")
+    p.add_argument("--color-space", choices=("lab", "ycrcb"), default="lab")
+
+    p = sub.add_parser("retinex", parents=[batch, video], help="temporal Retinex (enhance_video)")
+    if argv[:1] == ["retinex"]:
+        from models.retinex_temporal import enhance_video, ILLUM_MODES, QUANTILE_MODES
+        g = p.add_argument_group("retinex")
+        p.set_defaults(_retinex_params=_add_signature_args(
+            g, enhance_video, _RETINEX_SKIP, _RETINEX_RENAME,
+            {"illum_mode": ILLUM_MODES, "quantile_mode": QUANTILE_MODES},
+        ))
+    return ap
+
+
+def _frame_params(a) -> dict:
+    return {"codec": a.codec, "pipeline": a.pipeline, "threads": a.threads, "reuse_buffers": a.reuse_buffers,
+            "backend": a.backend}
+
+
+def _static_params(a) -> dict:
+    return {"skip_static": a.skip_static, "skip_block": a.skip_block, "skip_threshold": a.skip_threshold}
+
+
+PARAMS = {
+    "extract": lambda a: {
+        "mode": a.mode, "value": a.value, "ext": a.image_ext, "sparse": a.sparse,
+        "seek_min_step": a.seek_min_step, "png_compression": a.png_compression,
+        "jpeg_quality": a.jpeg_quality, "webp_quality": a.webp_quality,
+        "write_workers": a.write_workers, "write_queue": a.write_queue,
+        "target": a.target, "store_chunk_mb": a.store_chunk_mb,
+    },
+    "histeq": lambda a: dict(_frame_params(a), **_static_params(a), temporal=a.temporal,
+                             hist_alpha=a.hist_alpha, drift_threshold=a.drift_threshold),
+    "clahe": lambda a: dict(_frame_params(a), **_static_params(a), clip_limit=a.clip_limit, tile_grid_size=a.tile_grid_size,
+                            temporal=a.temporal, lut_alpha=a.lut_alpha, drift_threshold=a.drift_threshold),
+    "gamma": lambda a: dict(_frame_params(a), gamma=a.gamma, channel_gammas=a.channel_gammas,
+                            luminance_only=a.luminance_only, color_space=a.color_space),
+    "retinex": lambda a: dict({k: getattr(a, k) for k in a._retinex_params}, codec=a.codec),
+}
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    ap = build_parser(argv)
+    args = ap.parse_args(argv)
+    try:
+        jobs = plan_jobs(args)
+    except (ValueError, OSError) as e:
+        ap.error(str(e))
+
+    log = (lambda *_: None) if args.quiet else print
+    try:
+        failed = run_jobs(jobs, workers=args.workers, mem_mb=args.mem_budget, overwrite=args.overwrite, log=log)
+    except KeyboardInterrupt:
+        print("Interrupted; re-run the same command to resume.", file=sys.stderr)
+        return 130
+    if failed:
+        print(f"{failed} of {len(jobs)} job(s) failed.", file=sys.stderr)
+        return 1
+    return 0